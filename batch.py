@@ -0,0 +1,166 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from rich.console import Console
+from rich.table import Table
+from rich import box
+from main import merge_stats, CACHE_PATH, LANGUAGE_CACHE_TTL_DAYS
+from providers.registry import build_providers
+from utils.cache import ResponseCache, LanguageCache
+from utils.stats import YearStats
+from utils.visualizer import Visualizer
+
+# Per-process state, built once by the pool initializers and reused by every job
+_providers = []
+_viz = None
+
+
+def _init_collector():
+    global _providers
+    cache = ResponseCache(CACHE_PATH) if CACHE_PATH else None
+    lang_cache = LanguageCache(CACHE_PATH or None, ttl=LANGUAGE_CACHE_TTL_DAYS * 24 * 3600)
+    _providers = build_providers(os.environ, cache=cache, lang_cache=lang_cache)
+
+
+def _init_renderer(renderer):
+    global _viz
+    _viz = Visualizer(renderer)
+
+
+def collect_job(username, year, snapshot_dir=None):
+    """
+    Collects and merges one user/year. Runs inside a collector process.
+    Raises when every provider failed or was skipped, so the job is counted
+    as failed instead of rendering an empty report.
+    With a snapshot_dir the stats are saved there and only their path is
+    sent back, instead of the pickled stats.
+    """
+    started = time.perf_counter()
+    collected_stats = []
+    for provider in _providers:
+        try:
+            # Copies share the worker's authenticated client and language cache
+            target = provider.for_user(username)
+        except ValueError as e:
+            print(f"[Batch] {provider.name} skipped for {username}: {e}")
+            continue
+        try:
+            target.connect()
+            collected_stats.append(target.get_year_stats(year))
+        except Exception as e:
+            print(f"[Batch] {provider.name} failed for {username}/{year}: {e}")
+        # Keep the client created by the first job for the following ones
+        provider.client = provider.client or target.client
+
+    if not collected_stats:
+        raise RuntimeError("no provider returned data")
+    stats = merge_stats(collected_stats, year)
+    seconds = time.perf_counter() - started
+    if snapshot_dir:
+        path = os.path.join(snapshot_dir, f"stats_{username}_{year}.npz")
+        stats.save(path, user=username)
+        return path, stats.total_commits, seconds
+    return stats, stats.total_commits, seconds
+
+
+def render_job(stats, username, year, output_file):
+    """Renders one report from stats or a snapshot path. Runs inside a renderer process, reusing its template figure."""
+    if isinstance(stats, str):
+        stats = YearStats.load(stats)
+    _viz.generate_shareable_image(stats, username, year, output_file)
+    return _viz.timings
+
+
+def parse_list(value):
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate DevWrapped reports for many users and years.")
+    parser.add_argument('--users', type=parse_list, default=[], help="comma separated usernames")
+    parser.add_argument('--users-file', help="file with one username per line")
+    parser.add_argument('--years', type=parse_list, default=[os.getenv('TARGET_YEAR', '2024')],
+                        help="comma separated years (default: TARGET_YEAR)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="collector processes")
+    parser.add_argument('--render-workers', type=int, default=max(os.cpu_count() // 2, 1),
+                        help="renderer processes")
+    parser.add_argument('--renderer', choices=['template', 'classic'], default=os.getenv('RENDERER', 'template'))
+    parser.add_argument('--output-dir', default='reports')
+    parser.add_argument('--snapshot-dir', help="keep each user/year's stats as a snapshot (.npz) in this directory")
+    args = parser.parse_args()
+
+    console = Console()
+    users = list(args.users)
+    if args.users_file:
+        with open(args.users_file) as f:
+            users += [line.strip() for line in f if line.strip() and not line.startswith('#')]
+    if not users:
+        console.print("[bold red]No users given (--users or --users-file).[/bold red]")
+        raise SystemExit(1)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    if args.snapshot_dir:
+        os.makedirs(args.snapshot_dir, exist_ok=True)
+    jobs = [(user, int(year)) for user in dict.fromkeys(users) for year in args.years]
+    results = []
+    failures = 0
+    render_stages = {}
+    started = time.perf_counter()
+
+    # Collection and rendering run in separate pools: a report is rendered
+    # as soon as its stats arrive, while other users are still being fetched.
+    collectors = ProcessPoolExecutor(max_workers=args.workers, initializer=_init_collector)
+    renderers = ProcessPoolExecutor(max_workers=args.render_workers, initializer=_init_renderer,
+                                    initargs=(args.renderer,))
+    with collectors, renderers:
+        collecting = {collectors.submit(collect_job, user, year, args.snapshot_dir): (user, year)
+                      for user, year in jobs}
+        rendering = {}
+        for future in as_completed(collecting):
+            user, year = collecting[future]
+            try:
+                stats, commits, seconds = future.result()
+            except Exception as e:
+                failures += 1
+                console.print(f"[red]Batch error:[/red] {user}/{year}: {e}")
+                continue
+            output_file = os.path.join(args.output_dir, f"wrapped_{user}_{year}.png")
+            result = {'user': user, 'year': year, 'commits': commits,
+                      'seconds': seconds, 'report': output_file}
+            rendering[renderers.submit(render_job, stats, user, year, output_file)] = result
+
+        for future in as_completed(rendering):
+            result = rendering[future]
+            try:
+                timings = future.result()
+            except Exception as e:
+                failures += 1
+                console.print(f"[red]Render error:[/red] {result['user']}/{result['year']}: {e}")
+                continue
+            result['render'] = sum(timings.values())
+            for stage, seconds in timings.items():
+                render_stages[stage] = render_stages.get(stage, 0) + seconds
+            results.append(result)
+            console.print(f"[green]Done[/green] {result['user']}/{result['year']}")
+
+    elapsed = time.perf_counter() - started
+    table = Table(box=box.SIMPLE_HEAVY, show_header=True, title="Batch Summary")
+    table.add_column("User")
+    table.add_column("Year")
+    table.add_column("Commits", justify="right")
+    table.add_column("Fetch", justify="right")
+    table.add_column("Render", justify="right")
+    table.add_column("Report")
+    for r in sorted(results, key=lambda r: (r['user'], r['year'])):
+        table.add_row(r['user'], str(r['year']), str(r['commits']), f"{r['seconds']:.1f}s",
+                      f"{r['render']:.2f}s", r['report'])
+    console.print(table)
+
+    if render_stages:
+        console.print("Render time by stage: " + ", ".join(
+            f"{stage} {seconds:.2f}s" for stage, seconds in render_stages.items()))
+
+    total_commits = sum(r['commits'] for r in results)
+    console.print(f"[bold]{len(results)}[/bold] reports ({failures} failed) in {elapsed:.1f}s - "
+                  f"{len(results) / elapsed * 60:.1f} reports/min, {total_commits / elapsed:.0f} commits/s")
@@ -0,0 +1,305 @@
+"""
+Deterministic API fixtures for the benchmark server.
+
+SyntheticActivity generates commits on demand from their index, so a 100k
+commit year costs no memory until a page of it is requested. The backends
+translate that activity into GitHub REST/GraphQL and GitLab responses.
+RecordedBackend replays responses captured from the real APIs.
+"""
+import hashlib
+import json
+import random
+import re
+from urllib.parse import urlencode
+from datetime import datetime, timedelta, timezone
+
+LOGIN = 'bench-user'
+
+MESSAGES = [
+    "feat: add export endpoint", "fix: handle empty payload", "Refactor parser internals",
+    "docs: update README", "test: cover edge cases", "chore: bump dependencies",
+    "Merge branch 'main' into feature", "perf: cache lookups", "Update config", "wip",
+]
+FILES = [
+    "src/app.py", "src/models.py", "web/index.ts", "web/app.tsx", "README.md",
+    "cmd/main.go", "lib/core.rs", "styles/site.css", "Makefile", "scripts/deploy.sh",
+]
+LANGUAGES = [
+    {"Python": 8000, "Shell": 500}, {"TypeScript": 6000, "CSS": 1200}, {"Go": 9000},
+    {"Rust": 7000, "Python": 300}, {}, {"Java": 4000, "Kotlin": 2500},
+]
+
+
+class SyntheticActivity:
+    """`commits` commits by one user, spread evenly over `year` across `repos` repositories."""
+
+    def __init__(self, commits: int, year: int = 2024, repos: int = 50, seed: int = 0):
+        self.commits = commits
+        self.year = year
+        self.repos = repos
+        self.seed = seed
+        start = datetime(year, 1, 1, tzinfo=timezone.utc)
+        self._start = start
+        self._step = (datetime(year + 1, 1, 1, tzinfo=timezone.utc) - start) / max(commits, 1)
+
+    def repo(self, index):
+        return f"{LOGIN}/repo-{index % self.repos:03d}"
+
+    def commit(self, i):
+        """The i-th commit, in chronological order."""
+        rng = random.Random(self.seed * 1_000_003 + i)
+        files = rng.sample(FILES, rng.randint(1, 8))
+        return {
+            'sha': hashlib.sha1(f"{self.seed}:{i}".encode()).hexdigest(),
+            'date': self._start + self._step * i + timedelta(seconds=rng.randint(0, 600)),
+            'repo': self.repo(i),
+            'message': rng.choice(MESSAGES),
+            'additions': rng.randint(0, 400),
+            'deletions': rng.randint(0, 200),
+            'files': [(name, rng.randint(0, 80), rng.randint(0, 40)) for name in files],
+        }
+
+    def between(self, start, end):
+        """Indices of the commits dated from `start` to `end` (inclusive days)."""
+        first = (start - self._start) / self._step
+        last = (end + timedelta(days=1) - self._start) / self._step
+        return range(max(int(first), 0), min(max(int(last), 0), self.commits))
+
+    def sha_index(self):
+        """{sha: commit index}, built on first use by the detail endpoints."""
+        if not hasattr(self, '_sha_index'):
+            self._sha_index = {hashlib.sha1(f"{self.seed}:{i}".encode()).hexdigest(): i
+                               for i in range(self.commits)}
+        return self._sha_index
+
+    def repo_commits(self, repo, start=None, end=None):
+        """Indices of the commits of one repository, optionally dated from `start` to `end`."""
+        index = int(repo.rsplit('-', 1)[1])
+        span = self.between(start, end) if start is not None else range(self.commits)
+        first = span.start + (index - span.start) % self.repos
+        return range(first, span.stop, self.repos)
+
+    def languages(self, repo):
+        return LANGUAGES[int(repo.rsplit('-', 1)[1]) % len(LANGUAGES)]
+
+    # GitLab groups commits into pushes of 1-3 commits: push k covers 2 commits on average
+    def push_count(self):
+        return max(self.commits // 2, 1)
+
+    def push(self, k):
+        first = (k // 3) * 6 + [0, 1, 3][k % 3]
+        size = k % 3 + 1
+        commits = [self.commit(i) for i in range(first, min(first + size, self.commits))]
+        return commits
+
+    def pushes_between(self, start, end):
+        """Indices of the pushes whose last commit is dated from `start` to `end` (inclusive days)."""
+        # Every 6 commits form 3 pushes ending on commits 0, 2 and 5 of the block
+        def pushes_before(i):
+            return 3 * (i // 6) + sum(head < i % 6 for head in (0, 2, 5))
+        span = self.between(start, end)
+        return range(pushes_before(span.start), min(pushes_before(span.stop), self.push_count()))
+
+
+def _iso(dt):
+    return dt.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def _page_links(base, path, query, page, last):
+    """Link header in the GitHub/GitLab style."""
+    if page >= last:
+        return {}
+    params = dict(query, page=str(page + 1))
+    return {'Link': f'<{base}{path}?{urlencode(params)}>; rel="next"'}
+
+
+def _paginate(query, total, default_per_page=30):
+    per_page = int(query.get('per_page', default_per_page))
+    page = int(query.get('page', 1))
+    last = max((total + per_page - 1) // per_page, 1)
+    start = (page - 1) * per_page
+    return page, last, range(start, min(start + per_page, total))
+
+
+class GitHubRestBackend:
+    def __init__(self, activity: SyntheticActivity):
+        self.activity = activity
+
+    def _commit_json(self, base, i, detail=False):
+        c = self.activity.commit(i)
+        url = f"{base}/repos/{c['repo']}/commits/{c['sha']}"
+        data = {
+            'sha': c['sha'],
+            'url': url,
+            'html_url': url,
+            'commit': {
+                'message': c['message'],
+                'author': {'name': LOGIN, 'email': f"{LOGIN}@example.com", 'date': _iso(c['date'])},
+                'committer': {'name': LOGIN, 'email': f"{LOGIN}@example.com", 'date': _iso(c['date'])},
+            },
+            'repository': {'full_name': c['repo'], 'name': c['repo'].split('/')[1],
+                           'url': f"{base}/repos/{c['repo']}"},
+        }
+        if detail:
+            data['stats'] = {'additions': c['additions'], 'deletions': c['deletions'],
+                             'total': c['additions'] + c['deletions']}
+            data['files'] = [{'filename': name, 'additions': a, 'deletions': d, 'changes': a + d,
+                              'status': 'modified'} for name, a, d in c['files']]
+        return data
+
+    def handle(self, method, path, query, body, base):
+        parts = path.strip('/').split('/')
+        if path == '/user' or path == f"/users/{LOGIN}":
+            return 'GET /user', 200, {}, {'login': LOGIN, 'name': 'Bench User', 'id': 1,
+                                          'url': f"{base}/users/{LOGIN}"}
+        if path == '/rate_limit':
+            core = {'limit': 5000, 'remaining': 5000, 'reset': 0, 'used': 0}
+            return 'GET /rate_limit', 200, {}, {'resources': {'core': core, 'search': core}, 'rate': core}
+        if path == '/search/commits':
+            # Honours the committer-date range and, like the real API, stops at 1000 results
+            matching = range(self.activity.commits)
+            window = re.search(r'committer-date:(\S+)\.\.(\S+)', query.get('q', ''))
+            if window:
+                start, end = (datetime.fromisoformat(d).replace(tzinfo=timezone.utc) for d in window.groups())
+                matching = self.activity.between(start, end)
+            total = len(matching)
+            page, last, indices = _paginate(query, min(total, 1000))
+            items = [self._commit_json(base, matching[i]) for i in indices]
+            return ('GET /search/commits', 200, _page_links(base, path, query, page, last),
+                    {'total_count': total, 'incomplete_results': False, 'items': items})
+        if len(parts) == 5 and parts[0] == 'repos' and parts[3] == 'commits':
+            i = self.activity.sha_index().get(parts[4])
+            if i is None:
+                return 'GET /repos/:repo/commits/:sha', 404, {}, {'message': 'Not Found'}
+            return 'GET /repos/:repo/commits/:sha', 200, {}, self._commit_json(base, i, detail=True)
+        if len(parts) == 3 and parts[0] == 'repos':
+            return 'GET /repos/:repo', 200, {}, {'full_name': '/'.join(parts[1:]), 'language': None,
+                                                  'url': f"{base}{path}"}
+        if len(parts) == 4 and parts[0] == 'repos' and parts[3] == 'languages':
+            return 'GET /repos/:repo/languages', 200, {}, self.activity.languages(parts[2])
+        return None
+
+
+class GitHubGraphQLBackend:
+    def __init__(self, activity: SyntheticActivity):
+        self.activity = activity
+
+    def handle(self, method, path, query, body, base):
+        if method != 'POST' or path != '/graphql':
+            return None
+        request = json.loads(body)
+        variables = request['variables']
+
+        if 'contributionsCollection' in request['query']:
+            repos = [{'repository': {'nameWithOwner': self.activity.repo(r)}}
+                     for r in range(min(self.activity.repos, self.activity.commits, 100))]
+            data = {'user': {'id': 'U_1', 'contributionsCollection': {'commitContributionsByRepository': repos}}}
+            return 'POST /graphql contributions', 200, {}, {'data': data}
+
+        repo = f"{variables['owner']}/{variables['name']}"
+        since, until = (datetime.fromisoformat(variables[k][:10]).replace(tzinfo=timezone.utc)
+                        for k in ('since', 'until'))
+        indices = self.activity.repo_commits(repo, since, until)
+        offset = int(variables.get('cursor') or 0)
+        page = indices[offset:offset + 100]
+        nodes = []
+        for i in page:
+            c = self.activity.commit(i)
+            nodes.append({'oid': c['sha'], 'message': c['message'], 'authoredDate': _iso(c['date']),
+                          'additions': c['additions'], 'deletions': c['deletions']})
+        has_next = offset + 100 < len(indices)
+        history = {'pageInfo': {'hasNextPage': has_next, 'endCursor': str(offset + 100)}, 'nodes': nodes}
+        data = {'repository': {'defaultBranchRef': {'target': {'history': history}}}}
+        return 'POST /graphql history', 200, {}, {'data': data}
+
+
+class GitLabBackend:
+    def __init__(self, activity: SyntheticActivity):
+        self.activity = activity
+
+    def _project_id(self, repo):
+        return int(repo.rsplit('-', 1)[1]) + 1
+
+    def handle(self, method, path, query, body, base):
+        if not path.startswith('/api/v4/'):
+            return None
+        parts = path[len('/api/v4/'):].strip('/').split('/')
+
+        if parts == ['user']:
+            return 'GET /user', 200, {}, {'id': 1, 'username': LOGIN, 'name': 'Bench User'}
+        if parts == ['users']:
+            users = [{'id': 1, 'username': LOGIN, 'name': 'Bench User'}] if query.get('username') == LOGIN else []
+            return 'GET /users', 200, {}, users
+        if parts == ['events'] or parts[-1:] == ['events']:
+            # Honours the exclusive 'after'/'before' day bounds, as the real API does
+            start, end = self.activity._start, self.activity._start + self.activity._step * self.activity.commits
+            if query.get('after'):
+                start = datetime.fromisoformat(query['after']).replace(tzinfo=timezone.utc) + timedelta(days=1)
+            if query.get('before'):
+                end = datetime.fromisoformat(query['before']).replace(tzinfo=timezone.utc) - timedelta(days=1)
+            pushes = self.activity.pushes_between(start, end)
+            page, last, indices = _paginate(query, len(pushes), default_per_page=20)
+            events = []
+            for k in (pushes[i] for i in indices):
+                commits = self.activity.push(k)
+                if not commits:
+                    continue
+                head = commits[-1]
+                events.append({
+                    'id': k + 1,
+                    'project_id': self._project_id(head['repo']),
+                    'action_name': 'pushed to',
+                    'created_at': head['date'].strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z',
+                    'push_data': {
+                        'commit_count': len(commits),
+                        'action': 'pushed',
+                        'ref_type': 'branch',
+                        'commit_from': commits[0]['sha'],
+                        'commit_to': head['sha'],
+                        'ref': 'main',
+                        'commit_title': head['message'],
+                    },
+                })
+            return 'GET /events', 200, _page_links(base, path, query, page, last), events
+        if len(parts) == 3 and parts[0] == 'projects' and parts[2] == 'languages':
+            repo = self.activity.repo(int(parts[1]) - 1)
+            langs = self.activity.languages(repo)
+            total = sum(langs.values()) or 1
+            return ('GET /projects/:id/languages', 200, {},
+                    {k: round(v * 100 / total, 2) for k, v in langs.items()})
+        if len(parts) == 4 and parts[0] == 'projects' and parts[2:] == ['repository', 'commits']:
+            # ref_name is "from..to": answer with the commits of that push
+            head = query.get('ref_name', '').split('..')[-1]
+            i = self.activity.sha_index().get(head)
+            commits = []
+            if i is not None:
+                count = int(query.get('per_page', 20))
+                for j in range(i, max(i - count, -1), -1):
+                    c = self.activity.commit(j)
+                    commits.append({'id': c['sha'], 'title': c['message'],
+                                    'stats': {'additions': c['additions'], 'deletions': c['deletions']}})
+            return 'GET /projects/:id/repository/commits', 200, {}, commits
+        return None
+
+
+class RecordedBackend:
+    """
+    Replays recorded responses. The fixture file is a JSON list of
+    {"method", "path", "query" (optional), "status", "headers", "body"};
+    the first entry whose method, path and query items match is returned.
+    """
+
+    def __init__(self, path: str):
+        with open(path) as f:
+            self.responses = json.load(f)
+
+    def handle(self, method, path, query, body, base):
+        for response in self.responses:
+            if response.get('method', 'GET') != method or response['path'] != path:
+                continue
+            if any(query.get(k) != str(v) for k, v in response.get('query', {}).items()):
+                continue
+            payload = json.dumps(response['body']).replace('{base_url}', base)
+            return (f"{method} {path} (recorded)", response.get('status', 200),
+                    response.get('headers', {}), json.loads(payload))
+        return None
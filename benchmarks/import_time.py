@@ -0,0 +1,61 @@
+"""
+Startup import-time benchmark.
+
+Imports the CLI entry point in a fresh interpreter with `python -X importtime`
+and reports the total import time and the slowest modules. Exits with status 1
+when the budget is exceeded or when a heavy dependency is loaded at startup,
+so startup regressions stay visible.
+
+    python benchmarks/import_time.py [--module main] [--budget-ms 800] [--top 15]
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Must only be imported when actually used (a provider is configured, an image is drawn)
+LAZY_MODULES = ['matplotlib', 'seaborn', 'github', 'gitlab']
+
+
+def measure(module):
+    """Returns {module: (self_us, cumulative_us)} for a fresh `import module`."""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f"import {module}"],
+                            cwd=ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        timings[name.strip()] = (int(self_us), int(cumulative_us))
+    return timings
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--module', default='main')
+    parser.add_argument('--budget-ms', type=float, default=800)
+    parser.add_argument('--top', type=int, default=15)
+    args = parser.parse_args()
+
+    timings = measure(args.module)
+    total_ms = sum(self_us for self_us, _ in timings.values()) / 1000
+
+    print(f"{'cumulative':>12}  module")
+    for name, (_, cumulative_us) in sorted(timings.items(), key=lambda x: -x[1][1])[:args.top]:
+        print(f"{cumulative_us / 1000:>10.1f}ms  {name}")
+    print(f"\nimport {args.module}: {total_ms:.1f}ms total ({len(timings)} modules), budget {args.budget_ms:.0f}ms")
+
+    failed = False
+    eager = [m for m in LAZY_MODULES if m in timings]
+    if eager:
+        print(f"FAIL: imported at startup: {', '.join(eager)}")
+        failed = True
+    if total_ms > args.budget_ms:
+        print("FAIL: import time budget exceeded")
+        failed = True
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,98 @@
+"""
+Records real API responses as fixtures for the benchmark server.
+
+Runs one provider against the real API (no response cache) and writes every
+successful GET it sends as a RecordedBackend entry. The API root becomes
+`{base_url}`, request headers (and so the token) are never written, and
+`--as` replaces the account's login so the fixtures line up with the
+synthetic activity's repositories.
+
+    GITHUB_TOKEN=... python -m benchmarks.record github --output benchmarks/recorded/github_user.json
+    GITLAB_TOKEN=... python -m benchmarks.record gitlab --output benchmarks/recorded/gitlab_user.json
+"""
+import argparse
+import json
+import os
+import sys
+from urllib.parse import parse_qsl, urlsplit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.fixtures import LOGIN
+
+# Response headers worth replaying; the rest describe the recording session
+KEPT_HEADERS = {'link', 'x-oauth-scopes', 'x-accepted-oauth-scopes', 'x-page', 'x-per-page',
+                'x-next-page', 'x-prev-page', 'x-total', 'x-total-pages'}
+
+
+def record(provider, base_url, year, per_endpoint=3):
+    """Runs `provider` for `year` and returns the recorded entries, at most `per_endpoint` per endpoint."""
+    import requests
+    from utils.profiling import endpoint_name
+
+    root = urlsplit(base_url)
+    entries, seen = [], {}
+    send = requests.Session.send
+
+    def recording_send(session, request, **kwargs):
+        response = send(session, request, **kwargs)
+        url = urlsplit(request.url)
+        endpoint = endpoint_name(request.method, request.url)
+        if request.method == 'GET' and response.ok and seen.get(endpoint, 0) < per_endpoint:
+            seen[endpoint] = seen.get(endpoint, 0) + 1
+            entries.append({
+                'method': 'GET',
+                'path': url.path[len(root.path.rstrip('/')):] if url.netloc == root.netloc else url.path,
+                'query': {k: v for k, v in parse_qsl(url.query) if k not in ('page', 'per_page')},
+                'status': response.status_code,
+                'headers': {k: v for k, v in response.headers.items() if k.lower() in KEPT_HEADERS},
+                'body': response.json(),
+            })
+        return response
+
+    requests.Session.send = recording_send
+    try:
+        provider.connect()
+        provider.get_year_stats(year)
+    finally:
+        requests.Session.send = send
+    return entries
+
+
+def anonymize(entries, base_url, login=None):
+    """Replaces the API root with `{base_url}` and the account's login with `login`."""
+    text = json.dumps(entries, indent=2)
+    text = text.replace(base_url.rstrip('/'), '{base_url}')
+    if login:
+        user = next((e['body'] for e in entries if e['path'] in ('/user', '/api/v4/user')), {})
+        real = user.get('login') or user.get('username')
+        if real:
+            text = text.replace(real, login)
+    return text
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Record real API responses as benchmark fixtures.")
+    parser.add_argument('provider', choices=['github', 'gitlab'])
+    parser.add_argument('--year', type=int, default=2024)
+    parser.add_argument('--output', required=True)
+    parser.add_argument('--per-endpoint', type=int, default=3, help="responses kept per endpoint")
+    parser.add_argument('--as', dest='login', default=LOGIN,
+                        help=f"login written in place of the account's (default: {LOGIN}; empty keeps it)")
+    args = parser.parse_args()
+
+    if args.provider == 'github':
+        from providers.github_provider import GitHubProvider
+        base_url = os.environ.get('GITHUB_URL', 'https://api.github.com')
+        provider = GitHubProvider(os.environ['GITHUB_TOKEN'], base_url=base_url, engine='rest')
+    else:
+        from providers.gitlab_provider import GitLabProvider
+        url = os.environ.get('GITLAB_URL', 'https://gitlab.com')
+        base_url = url
+        provider = GitLabProvider(url, os.environ['GITLAB_TOKEN'], line_stats=True)
+
+    entries = record(provider, base_url, args.year, args.per_endpoint)
+    with open(args.output, 'w') as f:
+        f.write(anonymize(entries, base_url, args.login) + '\n')
+    print(f"Recorded {len(entries)} responses to {args.output}")
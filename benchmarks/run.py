@@ -0,0 +1,192 @@
+"""
+End-to-end benchmark suite, runnable without live tokens.
+
+Each provider runs against a local stand-in API server (benchmarks/server.py)
+fed with deterministic synthetic activity, served after the recorded
+responses in benchmarks/recorded/ (--fixtures, --no-fixtures). Every scenario runs in a fresh process so its peak
+memory is its own. Reports wall time, request count per endpoint, peak RSS
+and per-stage durations, and writes them as JSON for comparison between
+versions.
+
+    python -m benchmarks.run [--scales 1000,10000,100000] [--output bench_results.json]
+"""
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from glob import glob
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.fixtures import (GitHubGraphQLBackend, GitHubRestBackend, GitLabBackend,
+                                 RecordedBackend, SyntheticActivity)
+from benchmarks.server import StandInServer
+
+PROVIDER_SCENARIOS = ['github-rest', 'github-graphql', 'github-graphql-files', 'gitlab', 'gitlab-lines']
+SCENARIOS = PROVIDER_SCENARIOS + ['merge', 'render']
+RECORDED = sorted(glob(os.path.join(ROOT, 'benchmarks', 'recorded', '*.json')))
+
+
+def _build_provider(scenario, url):
+    if scenario.startswith('gitlab'):
+        from providers.gitlab_provider import GitLabProvider
+        return GitLabProvider(url, 'bench-token', line_stats=scenario.endswith('-lines'))
+    from providers.github_provider import GitHubProvider
+    engine = scenario.split('-')[1]
+    return GitHubProvider('bench-token', base_url=url, engine=engine, graphql_url=f"{url}/graphql",
+                          file_stats=scenario.endswith('-files'))
+
+
+def _peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+
+def _run_scenario(scenario, url, year, inputs, verbose):
+    """Runs one scenario; executed in a fresh process."""
+    stages = {}
+    output = None
+    out = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+    started = time.perf_counter()
+
+    with out:
+        if scenario in PROVIDER_SCENARIOS:
+            provider = _build_provider(scenario, url)
+            provider.connect()
+            stages['connect'] = time.perf_counter() - started
+            output = provider.get_year_stats(year)
+            stages['get_year_stats'] = time.perf_counter() - started - stages['connect']
+        elif scenario == 'merge':
+            from main import merge_stats
+            output = merge_stats(inputs, year)
+            stages['merge_stats'] = time.perf_counter() - started
+        else:
+            from utils.visualizer import Visualizer
+            viz = Visualizer('template')
+            with tempfile.TemporaryDirectory() as tmp:
+                for run in ('first', 'repeat'):
+                    viz.generate_shareable_image(inputs, 'bench-user', year, os.path.join(tmp, f"{run}.png"))
+                    for stage, seconds in viz.timings.items():
+                        stages[f"{run}.{stage}"] = seconds
+
+    result = {
+        'wall_s': time.perf_counter() - started,
+        'peak_rss_mb': _peak_rss_mb(),
+        'stages': stages,
+    }
+    if output is not None:
+        result['commits'] = int(output.total_commits)
+    return result, output
+
+
+def _version():
+    try:
+        return subprocess.run(['git', 'describe', '--always', '--dirty'], cwd=ROOT,
+                              capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def run(scales, scenarios, year=2024, fixtures=None, verbose=False):
+    spawn = multiprocessing.get_context('spawn')
+    results = []
+
+    for scale in scales:
+        activity = SyntheticActivity(scale, year)
+        backends = [RecordedBackend(path) for path in (RECORDED if fixtures is None else fixtures)]
+        backends += [GitHubRestBackend(activity), GitHubGraphQLBackend(activity), GitLabBackend(activity)]
+        collected = []
+
+        with StandInServer(backends) as server:
+            for scenario in scenarios:
+                if scenario == 'merge':
+                    inputs = collected
+                elif scenario == 'render':
+                    inputs = collected[0] if len(collected) == 1 else None
+                    if inputs is None:
+                        from utils.stats import YearStats
+                        inputs = YearStats.merge(collected, year)
+                else:
+                    inputs = None
+
+                server.reset_counts()
+                with ProcessPoolExecutor(max_workers=1, mp_context=spawn) as pool:
+                    result, output = pool.submit(_run_scenario, scenario, server.url, year,
+                                                 inputs, verbose).result()
+                requests = server.reset_counts()
+
+                if scenario in PROVIDER_SCENARIOS:
+                    collected.append(output)
+                result.update(scale=scale, scenario=scenario, requests=sum(requests.values()),
+                              requests_by_endpoint=dict(sorted(requests.items())))
+                results.append(result)
+                yield result
+
+
+if __name__ == "__main__":
+    from rich.console import Console
+    from rich.table import Table
+    from rich import box
+
+    parser = argparse.ArgumentParser(description="End-to-end benchmarks against a local stand-in API server.")
+    parser.add_argument('--scales', default='1000,10000,100000', help="comma separated commit counts")
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS),
+                        help=f"comma separated subset of: {', '.join(SCENARIOS)}")
+    parser.add_argument('--year', type=int, default=2024)
+    parser.add_argument('--fixtures', action='append',
+                        help="recorded responses (JSON) served before the synthetic ones; repeatable "
+                             "(default: benchmarks/recorded/*.json)")
+    parser.add_argument('--no-fixtures', action='store_true', help="serve synthetic responses only")
+    parser.add_argument('--output', default='bench_results.json')
+    parser.add_argument('--verbose', action='store_true', help="show provider output")
+    args = parser.parse_args()
+
+    scales = [int(s) for s in args.scales.split(',') if s.strip()]
+    scenarios = [s.strip() for s in args.scenarios.split(',') if s.strip()]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    if ('merge' in scenarios or 'render' in scenarios) and not set(scenarios) & set(PROVIDER_SCENARIOS):
+        parser.error("merge and render need at least one provider scenario")
+
+    console = Console()
+    table = Table(box=box.SIMPLE_HEAVY, show_header=True, title="Benchmarks")
+    table.add_column("Scale", justify="right")
+    table.add_column("Scenario")
+    table.add_column("Commits", justify="right")
+    table.add_column("Wall", justify="right")
+    table.add_column("Requests", justify="right")
+    table.add_column("Peak RSS", justify="right")
+
+    results = []
+    fixtures = [] if args.no_fixtures else args.fixtures
+    for r in run(scales, scenarios, args.year, fixtures, args.verbose):
+        results.append(r)
+        console.print(f"[green]Done[/green] {r['scenario']} @ {r['scale']:,} in {r['wall_s']:.2f}s")
+        table.add_row(f"{r['scale']:,}", r['scenario'], str(r.get('commits', '-')), f"{r['wall_s']:.2f}s",
+                      str(r['requests']), f"{r['peak_rss_mb']:.0f} MB")
+    console.print(table)
+
+    report = {
+        'version': _version(),
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'year': args.year,
+        'results': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    console.print(f"Results written to {args.output}")
@@ -0,0 +1,99 @@
+"""
+Local stand-in for the GitHub and GitLab APIs.
+
+Requests are answered by a chain of backends (see fixtures.py); the first
+one that returns a response wins. Every response carries generous
+X-RateLimit headers so the providers never pause, and requests are counted
+per endpoint so benchmarks can report how many calls a run costs.
+"""
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+
+class _Handler(BaseHTTPRequestHandler):
+    # Keep-alive, as the API clients expect from the real services
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are separate writes: without this, delayed ACKs stall every response
+    disable_nagle_algorithm = True
+
+    def _dispatch(self, method):
+        url = urlsplit(self.path)
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        endpoint, status, headers, payload = self.server.stand_in.respond(
+            method, url.path, dict(parse_qsl(url.query)), body)
+
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.send_header('X-RateLimit-Limit', '5000')
+        self.send_header('X-RateLimit-Remaining', '4999')
+        self.send_header('X-RateLimit-Reset', str(int(time.time()) + 3600))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StandInServer:
+    """Serves `backends` on 127.0.0.1; use as a context manager or call start()/stop()."""
+
+    def __init__(self, backends, port: int = 0):
+        self.backends = list(backends)
+        self.requests = Counter()
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer(('127.0.0.1', port), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.stand_in = self
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def respond(self, method, path, query, body):
+        for backend in self.backends:
+            response = backend.handle(method, path, query, body, self.url)
+            if response is not None:
+                break
+        else:
+            response = (f"{method} (unmatched)", 404, {}, {'message': 'Not Found'})
+        with self._lock:
+            self.requests[response[0]] += 1
+        return response
+
+    def reset_counts(self):
+        with self._lock:
+            counts = dict(self.requests)
+            self.requests.clear()
+        return counts
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
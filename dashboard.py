@@ -0,0 +1,253 @@
+"""
+Interactive DevWrapped dashboard.
+
+    streamlit run dashboard.py
+
+Stats come from the configured providers (through the same response cache
+as main.py) or from a directory of snapshots. Each source/year is collected
+once per session and memoised; the chart data for a selection is derived
+once from the merged arrays, so widget interactions only redraw. Provider
+data is kept as per-commit events, so the time zone, repository and date
+range filters re-aggregate it without fetching again.
+"""
+import glob
+import os
+from datetime import date
+from zoneinfo import available_timezones
+
+import altair as alt
+import numpy as np
+import pandas as pd
+import streamlit as st
+from dotenv import load_dotenv
+
+from main import CACHE_PATH, LANGUAGE_CACHE_TTL_DAYS, TARGET_YEAR, merge_stats
+from providers.registry import build_providers
+from utils.cache import LanguageCache, ResponseCache
+from utils.events import CommitEvents
+from utils.stats import YearStats
+from utils.visualizer import Visualizer
+
+load_dotenv()
+
+WEEKDAYS = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+
+
+# --- Data layer ---
+
+@st.cache_resource
+def get_providers():
+    """Providers are built once per server: their clients and caches are reused by every session."""
+    cache = ResponseCache(CACHE_PATH) if CACHE_PATH else None
+    lang_cache = LanguageCache(CACHE_PATH or None, ttl=LANGUAGE_CACHE_TTL_DAYS * 24 * 3600)
+    return build_providers(os.environ, cache=cache, lang_cache=lang_cache)
+
+
+@st.cache_data(show_spinner="Fetching provider data...")
+def provider_events(index, year):
+    """
+    One provider's (user, CommitEvents) for a year; None if it failed.
+    Providers are identified by their position in get_providers(), which is fixed per server.
+    """
+    provider = get_providers()[index]
+    try:
+        provider.connect()
+        return provider.get_user_info(), provider.get_year_events(year)
+    except Exception as e:
+        st.warning(f"{provider.name}: {e}")
+        return None
+
+
+@st.cache_data
+def snapshot_stats(path, mtime):
+    """A snapshot file's (user, YearStats); mtime invalidates the entry when the file changes."""
+    info = YearStats.snapshot_info(path)
+    return info.get('user'), YearStats.load(path)
+
+
+def list_snapshots(directory):
+    """{path: year} of the snapshots in a directory."""
+    found = {}
+    for path in sorted(glob.glob(os.path.join(directory, '*.npz'))):
+        try:
+            found[path] = YearStats.snapshot_info(path)['year']
+        except (ValueError, KeyError, OSError):
+            continue
+    return found
+
+
+@st.cache_data
+def chart_data(_parts, key, view=None):
+    """
+    Merges the selected sources once and pre-computes every chart's data.
+    `key` identifies the selection; the stats themselves are not hashed.
+    Event parts are first aggregated with `view` (time zone, projects, date range).
+    """
+    year = key[0]
+    stats = merge_stats([p.aggregate(year, **(view or {})) if isinstance(p, CommitEvents) else p
+                         for p in _parts], year)
+    day_p, max_p = stats.busiest_project_day()
+    day_c, max_c = stats.busiest_day()
+    per_day = stats.projects_per_day()
+    active_days = int((per_day > 0).sum())
+
+    days, hours = np.nonzero(stats.punch_card)
+    languages = pd.Series(stats.languages, dtype=float).sort_values(ascending=False)
+    commit_types = pd.Series(stats.commit_types, dtype=float).sort_values(ascending=False)
+    extensions = pd.Series(stats.extensions, dtype=float).sort_values(ascending=False)
+
+    return {
+        'metrics': {
+            'commits': int(stats.total_commits),
+            'lines_added': int(stats.lines_added),
+            'lines_deleted': int(stats.lines_deleted),
+            'projects': int(stats.projects_count),
+            'active_days': active_days,
+            'avg_projects': float(per_day.sum() / active_days) if active_days else 0.0,
+            'streak': stats.longest_streak(),
+            'gap': stats.longest_gap(),
+            'busiest_day': (day_c, max_c),
+            'busiest_project_day': (day_p, max_p),
+        },
+        'hourly': {h: int(v) for h, v in enumerate(stats.hours)},
+        'weekly': pd.DataFrame({'week': np.arange(1, 53), 'commits': stats.weeks[1:53]}),
+        'monthly': pd.DataFrame({'month': np.arange(1, 13), 'commits': stats.months[1:13]}),
+        'punch': pd.DataFrame({'day': [WEEKDAYS[d] for d in days], 'hour': hours,
+                               'commits': stats.punch_card[days, hours]}),
+        'daily': pd.DataFrame({'date': pd.to_datetime([stats.day_from_index(i) for i in np.flatnonzero(stats.days)]),
+                               'commits': stats.days[stats.days > 0]}),
+        'languages': languages,
+        'commit_types': commit_types,
+        'extensions': extensions,
+    }
+
+
+def top_with_other(series, n):
+    if len(series) <= n:
+        return series
+    top = series.iloc[:n].copy()
+    top['Other'] = series.iloc[n:].sum()
+    return top
+
+
+# --- Page ---
+
+st.set_page_config(page_title="DevWrapped", layout="wide")
+
+with st.sidebar:
+    st.header("DevWrapped")
+    source = st.radio("Source", ["Providers", "Snapshots"], horizontal=True)
+
+    parts, users, key, view = [], [], None, None
+    if source == "Providers":
+        providers = get_providers()
+        if not providers:
+            st.error("No provider configured (see .env-sample).")
+            st.stop()
+        year = st.number_input("Year", min_value=2008, max_value=2100, value=TARGET_YEAR, step=1)
+        indices = list(range(len(providers)))
+        chosen_providers = st.multiselect("Providers", indices, default=indices,
+                                          format_func=lambda i: providers[i].name)
+        if st.button("Refresh from providers"):
+            provider_events.clear()
+            chart_data.clear()
+        for index in chosen_providers:
+            result = provider_events(index, int(year))
+            if result:
+                users.append(result[0])
+                parts.append(result[1])
+        key = (int(year), source, tuple(chosen_providers))
+
+        # Re-slicing: applied to the cached events at aggregation time
+        zone = st.selectbox("Time zone", ["Local"] + sorted(available_timezones()),
+                            help="'Local' is the time zone of the machine serving the dashboard")
+        projects = list(dict.fromkeys(p for events in parts for p in events.projects))
+        chosen_projects = st.multiselect("Repositories", projects, default=projects, format_func=str)
+        span = st.date_input("Date range", (date(int(year), 1, 1), date(int(year), 12, 31)))
+        start, end = (tuple(span) + (None, None))[:2] if isinstance(span, (tuple, list)) else (span, span)
+        view = {
+            'tz': None if zone == "Local" else zone,
+            'projects': None if len(chosen_projects) == len(projects) else chosen_projects,
+            'start': start,
+            'end': end,
+        }
+    else:
+        directory = st.text_input("Snapshot directory", "snapshots")
+        snapshots = list_snapshots(directory)
+        years = sorted(set(snapshots.values()), reverse=True)
+        if not years:
+            st.info(f"No snapshots in '{directory}'. Create some with `python main.py --save-snapshots {directory}`.")
+            st.stop()
+        year = st.selectbox("Year", years)
+        paths = [p for p, y in snapshots.items() if y == year]
+        chosen = st.multiselect("Snapshots", paths, default=paths, format_func=os.path.basename)
+        for path in chosen:
+            user, stats = snapshot_stats(path, os.path.getmtime(path))
+            if user:
+                users.append(user)
+            parts.append(stats)
+        key = (int(year), source, tuple((p, os.path.getmtime(p)) for p in chosen))
+
+    top_n = st.slider("Languages shown", 3, 15, 5)
+
+if not parts:
+    st.warning("No data for this selection.")
+    st.stop()
+
+data = chart_data(parts, key, view)
+metrics = data['metrics']
+display_name = users[0].split('(')[0].strip() if users else "Dev"
+
+st.title(f"DEV WRAPPED {key[0]}")
+st.caption(f"@{display_name} · {Visualizer().determine_persona(data['hourly'])}")
+
+cols = st.columns(6)
+cols[0].metric("Commits", f"{metrics['commits']:,}")
+cols[1].metric("Lines", f"+{metrics['lines_added']:,}", f"-{metrics['lines_deleted']:,}", delta_color="off")
+cols[2].metric("Longest Streak", f"{metrics['streak']} days")
+cols[3].metric("Longest Break", f"{metrics['gap']} days")
+day_c, max_c = metrics['busiest_day']
+cols[4].metric("Max Commits/Day", max_c, day_c.strftime("%d %b") if day_c else None, delta_color="off")
+day_p, max_p = metrics['busiest_project_day']
+cols[5].metric("Max Projects/Day", max_p, day_p.strftime("%d %b") if day_p else None, delta_color="off")
+
+st.subheader("Weekly Velocity")
+st.area_chart(data['weekly'], x='week', y='commits', color='#00ff41')
+
+left, right = st.columns(2)
+with left:
+    st.subheader("Activity Heatmap")
+    st.altair_chart(
+        alt.Chart(data['punch']).mark_circle(color='#e91e63', opacity=0.7).encode(
+            x=alt.X('day:O', sort=WEEKDAYS, title=None),
+            y=alt.Y('hour:O', title=None),
+            size=alt.Size('commits:Q', legend=None),
+            tooltip=['day', 'hour', 'commits']),
+        width='stretch')
+with right:
+    st.subheader("Top Languages")
+    languages = top_with_other(data['languages'], top_n)
+    if languages.empty:
+        st.info("No language data.")
+    else:
+        frame = languages.rename('weight').rename_axis('language').reset_index()
+        st.altair_chart(
+            alt.Chart(frame).mark_arc(innerRadius=70).encode(
+                theta='weight:Q', color=alt.Color('language:N', sort=list(frame['language'])),
+                tooltip=['language', alt.Tooltip('weight:Q', format='.1f')]),
+            width='stretch')
+
+left, right = st.columns(2)
+with left:
+    st.subheader("Daily Commits")
+    st.bar_chart(data['daily'], x='date', y='commits')
+with right:
+    st.subheader("Commit Types")
+    st.bar_chart(data['commit_types'].rename('commits'))
+
+with st.expander("Details"):
+    st.write(f"{metrics['projects']} projects, {metrics['active_days']} active days, "
+             f"{metrics['avg_projects']:.2f} projects per active day")
+    st.bar_chart(data['monthly'], x='month', y='commits')
+    if not data['extensions'].empty:
+        st.dataframe(data['extensions'].rename('changes').head(20))
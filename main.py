@@ -1,91 +1,142 @@
+import argparse
 import os
+import re
 import sys
+import threading
+import time
+from concurrent.futures import Future, TimeoutError
 from dotenv import load_dotenv
-from providers.gitlab_provider import GitLabProvider
-from providers.github_provider import GitHubProvider
+from providers.registry import build_providers
 from utils.visualizer import Visualizer
+from utils.cache import ResponseCache, LanguageCache
+from utils.stats import YearStats
+from utils.profiling import profiler
 
 load_dotenv()
 TARGET_YEAR = int(os.getenv('TARGET_YEAR', 2024))
+CACHE_PATH = os.getenv('CACHE_PATH', '.devwrapped_cache.db')
+LANGUAGE_CACHE_TTL_DAYS = float(os.getenv('LANGUAGE_CACHE_TTL_DAYS', 7))
 
 
-def merge_stats(all_stats):
-    merged = {
-        'total_commits': 0,
-        'projects_count': 0,
-        'lines_added': 0,
-        'lines_deleted': 0,
-        'commits_by_month': {},
-        'commits_by_hour': {},
-        'languages': {},
-        'dates': set(),
-        'punch_card': {},
-        'extensions': {},
-        'weekly_activity': {},
-        'commit_types': {},
-        'daily_projects': {},
-        'daily_commits': {}
-    }
-
-    for stat in all_stats:
-        merged['total_commits'] += stat.get('total_commits', 0)
-        merged['projects_count'] += stat.get('projects_count', 0)
-        merged['lines_added'] += stat.get('lines_added', 0)
-        merged['lines_deleted'] += stat.get('lines_deleted', 0)
-
-        # Merge numeric dictionaries
-        for field in ['commits_by_month', 'commits_by_hour', 'languages',
-                      'punch_card', 'extensions', 'weekly_activity', 'commit_types']:
-            for k, v in stat.get(field, {}).items():
-                merged[field][k] = merged[field].get(k, 0) + v
-
-        # Merge Sets
-        merged['dates'].update(stat.get('dates', set()))
-
-        # Merge Daily Projects (Set union)
-        for date, projs in stat.get('daily_projects', {}).items():
-            if date not in merged['daily_projects']:
-                merged['daily_projects'][date] = set()
-            merged['daily_projects'][date].update(projs)
-
-        # Merge Daily Commits (Integer sum)
-        for date, count in stat.get('daily_commits', {}).items():
-            merged['daily_commits'][date] = merged['daily_commits'].get(date, 0) + count
-
-    return merged
+def merge_stats(all_stats, year=TARGET_YEAR):
+    """Merges the YearStats, plain stats dicts or snapshot files (.npz) of every provider."""
+    with profiler.span('merge_stats'):
+        loaded = [YearStats.load(s) if isinstance(s, (str, os.PathLike)) else s for s in all_stats]
+        return YearStats.merge(loaded, year)
+
+
+def snapshot_paths(directory, provider_names, year):
+    """One snapshot file per provider instance; names that slug alike are numbered in registration order."""
+    paths, taken = {}, set()
+    for name in provider_names:
+        slug = base = re.sub(r'\W+', '_', name).strip('_').lower()
+        n = 1
+        while slug in taken:
+            n += 1
+            slug = f"{base}_{n}"
+        taken.add(slug)
+        paths[name] = os.path.join(directory, f"{slug}_{year}.npz")
+    return paths
+
+
+def collect_provider(provider, year):
+    provider.connect()
+    return provider.get_user_info(), provider.get_year_stats(year)
+
+
+def run_in_background(fn, *args):
+    # Daemon thread: a provider that hangs past its timeout cannot block exit
+    future = Future()
+
+    def target():
+        if future.set_running_or_notify_cancel():
+            try:
+                future.set_result(fn(*args))
+            except BaseException as e:
+                future.set_exception(e)
+
+    threading.Thread(target=target, daemon=True).start()
+    return future
 
 
 if __name__ == "__main__":
-    viz = Visualizer()
+    parser = argparse.ArgumentParser(description="Generate your DevWrapped report.")
+    parser.add_argument('--no-image', action='store_true',
+                        help="print the terminal report only (matplotlib is never loaded)")
+    parser.add_argument('--profile', action='store_true',
+                        help="print time spent per stage, HTTP requests per endpoint and cache hit ratios")
+    parser.add_argument('--profile-json', metavar='FILE', help="write the profile summary as JSON")
+    parser.add_argument('--profile-trace', metavar='FILE', help="write the profile as a Chrome trace")
+    parser.add_argument('--save-snapshots', metavar='DIR',
+                        help="also write each provider's stats as a snapshot (.npz) to DIR")
+    parser.add_argument('--from-snapshots', metavar='FILE', nargs='+',
+                        help="skip the providers and report on previously saved snapshots")
+    args = parser.parse_args()
+    if args.profile or args.profile_json or args.profile_trace:
+        profiler.enable()
+
+    viz = Visualizer(os.getenv('RENDERER', 'template'))
+    year = TARGET_YEAR
+    collected_stats = []
+    user_names = []
     active_providers = []
 
-    if os.getenv('GITLAB_TOKEN'):
-        active_providers.append(GitLabProvider(os.getenv('GITLAB_URL'), os.getenv('GITLAB_TOKEN')))
-    if os.getenv('GITHUB_TOKEN'):
-        active_providers.append(GitHubProvider(os.getenv('GITHUB_TOKEN')))
-
-    if not active_providers:
-        viz.console.print("[bold red]No provider configured.[/bold red]")
-        sys.exit(1)
+    if args.from_snapshots:
+        infos = [YearStats.snapshot_info(path) for path in args.from_snapshots]
+        years = {info['year'] for info in infos}
+        if len(years) > 1:
+            viz.console.print(f"[bold red]Snapshots cover different years: {sorted(years)}[/bold red]")
+            sys.exit(1)
+        year = years.pop()
+        collected_stats = list(args.from_snapshots)
+        user_names = [info['user'] for info in infos if info.get('user')]
+    else:
+        cache = ResponseCache(CACHE_PATH) if CACHE_PATH else None
+        lang_cache = LanguageCache(CACHE_PATH or None, ttl=LANGUAGE_CACHE_TTL_DAYS * 24 * 3600)
+        active_providers = build_providers(os.environ, cache=cache, lang_cache=lang_cache)
+
+        if not active_providers:
+            viz.console.print("[bold red]No provider configured.[/bold red]")
+            sys.exit(1)
 
     with viz.console.status("[bold green]Processing data...[/bold green]") as status:
-        collected_stats = []
-        user_names = []
+        started = time.monotonic()
+        futures = []
+        if args.save_snapshots:
+            snapshots = snapshot_paths(args.save_snapshots, [p.name for p in active_providers], TARGET_YEAR)
         for provider in active_providers:
+            provider.on_progress = lambda msg: status.update(f"[bold green]{msg}[/bold green]")
+            futures.append(run_in_background(collect_provider, provider, TARGET_YEAR))
+
+        # Results are read in registration order so the merge is deterministic
+        for provider, future in zip(active_providers, futures):
+            remaining = max(provider.timeout - (time.monotonic() - started), 0)
             try:
-                provider.connect()
-                user_names.append(provider.get_user_info())
-                stats = provider.get_year_stats(TARGET_YEAR)
+                user_name, stats = future.result(timeout=remaining)
+                user_names.append(user_name)
                 collected_stats.append(stats)
+                if args.save_snapshots:
+                    os.makedirs(args.save_snapshots, exist_ok=True)
+                    stats.save(snapshots[provider.name], user=user_name, provider=provider.name)
+            except TimeoutError:
+                viz.console.print(f"[red]Provider error:[/red] {provider.name} timed out after {provider.timeout:.0f}s")
             except Exception as e:
-                viz.console.print(f"[red]Provider error:[/red] {e}")
+                viz.console.print(f"[red]Provider error:[/red] {provider.name}: {e}")
 
     if collected_stats:
-        final_stats = merge_stats(collected_stats)
+        final_stats = merge_stats(collected_stats, year)
         display_name = user_names[0].split('(')[0].strip() if user_names else "Dev"
 
-        viz.print_terminal_report(final_stats, display_name, TARGET_YEAR)
-        img_path = viz.generate_shareable_image(final_stats, display_name, TARGET_YEAR)
+        viz.print_terminal_report(final_stats, display_name, year)
+        if not args.no_image:
+            img_path = viz.generate_shareable_image(final_stats, display_name, year)
+
+            viz.console.print(
+                f"\n[bold green]Image saved:[/bold green] [link=file://{os.getcwd()}/{img_path}]{img_path}[/link]")
 
-        viz.console.print(
-            f"\n[bold green]Image saved:[/bold green] [link=file://{os.getcwd()}/{img_path}]{img_path}[/link]")
\ No newline at end of file
+    if args.profile:
+        profiler.print_summary(viz.console)
+    if args.profile_json:
+        profiler.export(args.profile_json, 'json')
+    if args.profile_trace:
+        profiler.export(args.profile_trace, 'chrome')
\ No newline at end of file
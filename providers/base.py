@@ -1,7 +1,31 @@
+import copy
 from abc import ABC, abstractmethod
-from typing import Dict, Any
+from utils.events import CommitEvents
+from utils.profiling import profiler
+from utils.stats import YearStats
 
 class GitProvider(ABC):
+    # Label used in logs and error messages
+    name = None
+    # Seconds main.py waits for this provider before giving up on it
+    timeout = None
+    # Optional callback receiving human readable progress messages
+    on_progress = None
+
+    def report_progress(self, message: str):
+        if self.on_progress:
+            self.on_progress(message)
+
+    def for_user(self, username: str):
+        """
+        Returns a copy of this provider targeting another user. The copy
+        shares the authenticated client and the caches of the original.
+        """
+        clone = copy.copy(self)
+        clone.username = username
+        clone.user = None
+        return clone
+
     @abstractmethod
     def connect(self):
         """Authenticates with the provider."""
@@ -13,10 +37,22 @@ class GitProvider(ABC):
         pass
 
     @abstractmethod
-    def get_year_stats(self, year: int) -> Dict[str, Any]:
+    def get_year_events(self, year: int) -> CommitEvents:
+        """
+        Retrieves the specified year's activity as one event per commit (or
+        per push), unaggregated, so it can be re-sliced by time zone,
+        project or date range without fetching again.
+        """
+        pass
+
+    def get_year_stats(self, year: int) -> YearStats:
         """
-        Retrieves statistics for the specified year.
-        Expected output structure:
+        Retrieves statistics for the specified year, bucketed in local time.
+        Overrides must return a YearStats: main.py saves it as a snapshot,
+        and Visualizer and print_terminal_report call its methods. A plain
+        dict with the structure below is only accepted by YearStats.merge()
+        and from_dict(), which convert it; the same structure is the
+        YearStats dict view (stats['field'] / to_dict()):
         {
             'total_commits': int,
             'projects_count': int,
@@ -29,8 +65,11 @@ class GitProvider(ABC):
             'punch_card': {(weekday, hour): count},
             'extensions': {'.py': 100, '.md': 20},
             'weekly_activity': {1: 50, ... 52: 10},
+            'commit_types': {'Feature': 10, 'Bugfix': 5},
             'daily_projects': {'2024-01-01': {'projA', 'projB'}},
             'daily_commits': {'2024-01-01': int}
         }
         """
-        pass
\ No newline at end of file
+        events = self.get_year_events(year)
+        with profiler.span('events.aggregate'):
+            return events.aggregate(year)
@@ -0,0 +1,138 @@
+import json
+import time
+import urllib.error
+import urllib.request
+from datetime import date
+from utils.profiling import endpoint_name, profiler
+from utils.ratelimit import scheduler
+
+# commitContributionsByRepository returns at most this many repositories
+MAX_REPOSITORIES = 100
+
+CONTRIBUTIONS_QUERY = """
+query($login: String!, $from: DateTime!, $to: DateTime!) {
+  user(login: $login) {
+    id
+    contributionsCollection(from: $from, to: $to) {
+      commitContributionsByRepository(maxRepositories: %d) {
+        repository { nameWithOwner }
+      }
+    }
+  }
+}
+""" % MAX_REPOSITORIES
+
+HISTORY_QUERY = """
+query($owner: String!, $name: String!, $author: ID!, $since: GitTimestamp!, $until: GitTimestamp!, $cursor: String) {
+  repository(owner: $owner, name: $name) {
+    defaultBranchRef {
+      target {
+        ... on Commit {
+          history(first: 100, after: $cursor, since: $since, until: $until, author: {id: $author}) {
+            pageInfo { hasNextPage endCursor }
+            nodes { oid message authoredDate additions deletions }
+          }
+        }
+      }
+    }
+  }
+}
+"""
+
+
+class GitHubGraphQLClient:
+    """
+    Minimal GitHub GraphQL v4 client.
+    One history page returns up to 100 commits including line counts, which
+    replaces the REST search page plus per-commit detail requests.
+    """
+
+    def __init__(self, token: str, url: str = 'https://api.github.com/graphql', max_retries: int = 5):
+        self.token = token
+        self.url = url
+        self.max_retries = max_retries
+
+    def query(self, query: str, **variables) -> dict:
+        body = json.dumps({'query': query, 'variables': variables}).encode()
+        request = urllib.request.Request(self.url, data=body, headers={
+            'Authorization': f"bearer {self.token}",
+            'Content-Type': 'application/json',
+        })
+
+        endpoint = endpoint_name('POST', self.url)
+        for attempt in range(self.max_retries):
+            scheduler.acquire(self.url)
+            try:
+                with profiler.span(endpoint, 'http'), urllib.request.urlopen(request) as response:
+                    scheduler.observe(self.url, response.status, response.headers)
+                    payload = json.load(response)
+            except urllib.error.HTTPError as e:
+                scheduler.observe(self.url, e.code, e.headers)
+                if e.code not in (403, 429, 502):
+                    raise
+                reset = e.headers.get('X-RateLimit-Reset')
+                delay = max(int(reset) - time.time(), 0) + 1 if reset else 2 ** attempt
+                print(f"[GitHub] GraphQL rate limited, retrying in {delay:.0f}s...")
+                with profiler.span('github.rate_limit_wait', 'wait'):
+                    time.sleep(delay)
+                continue
+
+            # Errors often come with partial data (e.g. one repository behind SAML
+            # enforcement): only a response without any data is fatal
+            errors = payload.get('errors') or []
+            if payload.get('data') is None:
+                message = errors[0].get('message') if errors else 'no data'
+                raise RuntimeError(f"GraphQL error: {message}")
+            for error in errors:
+                print(f"[GitHub] GraphQL warning: {error.get('message')}")
+            return payload['data']
+
+        raise RuntimeError("GraphQL request failed: retries exhausted")
+
+    def fetch_commit_records(self, login: str, since: date, year: int):
+        """Yields the user's default-branch commits from `since` to the end of `year`."""
+        start = f"{since.isoformat()}T00:00:00Z"
+        end = f"{year}-12-31T23:59:59Z"
+
+        user = self.query(CONTRIBUTIONS_QUERY, login=login, **{'from': start, 'to': end})['user']
+        if user is None:
+            raise RuntimeError(f"GraphQL error: unknown user {login}")
+        contributions = user['contributionsCollection']['commitContributionsByRepository']
+        if len(contributions) >= MAX_REPOSITORIES:
+            print(f"[GitHub] Commits in more than {MAX_REPOSITORIES} repositories: only the top "
+                  f"{MAX_REPOSITORIES} are read by the GraphQL engine (use the REST engine for all)")
+
+        for contribution in contributions:
+            if not contribution.get('repository'):
+                continue
+            repo_name = contribution['repository']['nameWithOwner']
+            owner, name = repo_name.split('/', 1)
+            cursor = None
+
+            while True:
+                data = self.query(HISTORY_QUERY, owner=owner, name=name, author=user['id'],
+                                  since=start, until=end, cursor=cursor)
+                if data.get('repository') is None:
+                    # Deleted, renamed or no longer accessible since the contribution
+                    print(f"[GitHub] Skipping {repo_name}: repository not accessible")
+                    break
+                branch = data['repository']['defaultBranchRef']
+                if not branch:
+                    break
+                history = branch['target']['history']
+
+                for node in history['nodes']:
+                    yield {
+                        'id': node['oid'],
+                        'date': node['authoredDate'].replace('Z', '+00:00'),
+                        'repo': repo_name,
+                        'message': node['message'],
+                        'additions': node['additions'],
+                        'deletions': node['deletions'],
+                        # File lists are not exposed by the history connection
+                        'files': [],
+                    }
+
+                if not history['pageInfo']['hasNextPage']:
+                    break
+                cursor = history['pageInfo']['endCursor']
@@ -1,20 +1,61 @@
-from github import Github
-from datetime import datetime
-import os
+from github import Github, GithubException, RateLimitExceededException
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+import math
+import time
 from .base import GitProvider
+from .github_graphql import GitHubGraphQLClient
+from utils.cache import LanguageCache
+from utils.classify import classify_commits
+from utils.events import CommitEvents
+from utils.languages import summarize_files
+from utils.profiling import profiler
+from utils.ratelimit import scheduler
+
+# GitHub search never returns more than this many results for one query
+SEARCH_CAP = 1000
+
+
+def graphql_url_for(base_url: str) -> str:
+    """GraphQL endpoint of a REST API root: https://api.github.com/graphql, or /api/graphql on GitHub Enterprise."""
+    base = base_url.rstrip('/')
+    if base.endswith('/api/v3'):
+        return f"{base[:-len('/v3')]}/graphql"
+    return f"{base}/graphql"
 
 
 class GitHubProvider(GitProvider):
-    def __init__(self, token: str):
+    def __init__(self, token: str, max_workers: int = 8, max_retries: int = 5, cache=None,
+                 lang_cache=None, engine: str = 'rest', graphql_url: str = None,
+                 username: str = None, base_url: str = 'https://api.github.com', file_stats: bool = False):
+        if engine not in ('rest', 'graphql'):
+            raise ValueError(f"Unknown GitHub engine: {engine}")
+        self.name = "GitHub"
         self.token = token
+        self.base_url = base_url
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.engine = engine
+        self.graphql_url = graphql_url or graphql_url_for(base_url)
+        # Cache keys are namespaced by instance, like GitLab's: github.com and
+        # an Enterprise server can have the same login and repository names
+        self.cache_key = f"github:{base_url}"
+        # GraphQL only: also fetch each commit's changed files over REST
+        self.file_stats = file_stats
+        self.cache = cache
+        self.languages = lang_cache or LanguageCache(None)
+        self.username = username
         self.client = None
         self.user = None
-        self._lang_cache = {}
 
     def connect(self):
         try:
-            self.client = Github(self.token)
-            self.user = self.client.get_user()
+            if not self.client:
+                # Pacing is left to the shared scheduler instead of PyGithub's fixed request spacing
+                scheduler.install()
+                self.client = Github(self.token, base_url=self.base_url, per_page=100,
+                                     seconds_between_requests=None)
+            self.user = self.client.get_user(self.username) if self.username else self.client.get_user()
             print(f"[GitHub] Connected as: {self.user.login}")
         except Exception as e:
             raise ConnectionError(f"GitHub connection error: {e}")
@@ -23,99 +64,253 @@ class GitHubProvider(GitProvider):
         display_name = self.user.name if self.user.name else self.user.login
         return f"{display_name} (@{self.user.login})"
 
-    def _get_repo_languages(self, repo):
-        repo_name = repo.full_name
-        if repo_name in self._lang_cache:
-            return self._lang_cache[repo_name]
+    def _load_repo_languages(self, repo_name):
+        # Optional enrichment: skipped (and retried next run) when the budget is low
+        if not scheduler.has_budget(f"{self.base_url}/repos/{repo_name}/languages"):
+            return None
         try:
-            raw = repo.get_languages()
+            repo = self.client.get_repo(repo_name, lazy=True)
+            # PyGithub 2.x adds the request 'url' to the payload: keep byte counts only
+            raw = {k: v for k, v in repo.get_languages().items() if isinstance(v, int)}
             total = sum(raw.values())
             if total == 0:
                 return {repo.language or "Unknown": 1.0}
 
-            res = {k: v / total for k, v in raw.items()}
-            self._lang_cache[repo_name] = res
-            return res
+            return {k: v / total for k, v in raw.items()}
         except:
-            return {"Unknown": 1.0}
+            return None
 
-    def get_year_stats(self, year: int) -> dict:
-        if not self.client:
-            self.connect()
+    def _get_repo_languages(self, repo_name):
+        return self.languages.get(f"{self.cache_key}:{repo_name}") or {"Unknown": 1.0}
 
-        print(f"[GitHub] Querying data for {year}...")
-        start_date = f"{year}-01-01"
-        end_date = f"{year}-12-31"
-        query = f"author:{self.user.login} committer-date:{start_date}..{end_date}"
-
-        commits = self.client.search_commits(query)
-
-        stats = {
-            'total_commits': commits.totalCount,
-            'projects_count': 0,
-            'lines_added': 0,
-            'lines_deleted': 0,
-            'commits_by_month': {i: 0 for i in range(1, 13)},
-            'commits_by_hour': {i: 0 for i in range(24)},
-            'languages': {},
-            'dates': set(),
-            'punch_card': {},
-            'extensions': {},
-            'weekly_activity': {i: 0 for i in range(1, 54)},
-            'daily_projects': {},
-            'daily_commits': {},
-            'commit_types': {},
-            '_temp_projects': set()
-        }
-
-        for commit in commits:
-            raw_date = commit.commit.author.date
-            local_date = raw_date.astimezone()
-
-            date_str = local_date.strftime('%Y-%m-%d')
-            week_num = local_date.isocalendar()[1]
-            weekday = local_date.weekday()
-            hour = local_date.hour
-
-            # 1. Base Stats
-            stats['commits_by_month'][local_date.month] += 1
-            stats['commits_by_hour'][hour] += 1
-            stats['dates'].add(date_str)
-
-            # 2. Punch Card
-            pc_key = (weekday, hour)
-            stats['punch_card'][pc_key] = stats['punch_card'].get(pc_key, 0) + 1
-
-            # 3. Weekly Velocity
-            stats['weekly_activity'][week_num] = stats['weekly_activity'].get(week_num, 0) + 1
-
-            # 4. Project & Context Switcher
-            repo = commit.repository
-            stats['_temp_projects'].add(repo.full_name)
-            if date_str not in stats['daily_projects']:
-                stats['daily_projects'][date_str] = set()
-            stats['daily_projects'][date_str].add(repo.full_name)
-            stats['daily_commits'][date_str] = stats['daily_commits'].get(date_str, 0) + 1
-
-            # 5. Lines & Extensions
-            if commit.stats:
-                stats['lines_added'] += commit.stats.additions
-                stats['lines_deleted'] += commit.stats.deletions
+    def _wait_for_rate_limit(self, attempt):
+        # Sleep until the advertised reset when the quota is exhausted,
+        # otherwise back off exponentially (secondary/abuse limits).
+        remaining, _ = self.client.rate_limiting
+        if remaining == 0:
+            delay = max(self.client.rate_limiting_resettime - time.time(), 0) + 1
+        else:
+            delay = 2 ** attempt
+        print(f"[GitHub] Rate limited, retrying in {delay:.0f}s...")
+        with profiler.span('github.rate_limit_wait', 'wait'):
+            time.sleep(delay)
 
+    def _fetch_commit_details(self, commit):
+        """
+        Loads stats and changed files of a search result (one request per commit).
+        Returns None when the request budget only covers search pages any more,
+        or when the commit could not be loaded.
+        """
+        if not scheduler.has_budget(commit.url):
+            return None
+        with profiler.span('github.commit_details'):
+            return self._load_commit_details(commit)
+
+    def _load_commit_details(self, commit):
+        for attempt in range(self.max_retries):
             try:
-                for f in commit.files[:5]:
-                    filename = f.filename
-                    ext = os.path.splitext(filename)[1].lower()
-                    if ext and len(ext) < 10:
-                        stats['extensions'][ext] = stats['extensions'].get(ext, 0) + 1
-            except:
-                pass
-
-            # 6. Languages
-            breakdown = self._get_repo_languages(repo)
-            for lang, ratio in breakdown.items():
-                stats['languages'][lang] = stats['languages'].get(lang, 0) + (1 * ratio)
-
-        stats['projects_count'] = len(stats['_temp_projects'])
-        del stats['_temp_projects']
-        return stats
\ No newline at end of file
+                additions = deletions = 0
+                if commit.stats:
+                    additions = commit.stats.additions
+                    deletions = commit.stats.deletions
+                return additions, deletions, self._commit_files(commit)
+            except RateLimitExceededException:
+                self._wait_for_rate_limit(attempt)
+            except GithubException as e:
+                # One unreadable commit (e.g. a 5xx or a repository gone private)
+                # leaves its record partial, retried on the next run
+                print(f"[GitHub] Details unavailable for {commit.sha[:7]}: {e.status}")
+                return None
+        return None
+
+    def _commit_files(self, commit):
+        """Every changed file of a loaded commit as [filename, additions, deletions]."""
+        try:
+            # The first page comes with the commit; larger commits page through the rest
+            return [[f.filename, f.additions, f.deletions] for f in commit.files]
+        except RateLimitExceededException:
+            raise
+        except GithubException as e:
+            print(f"[GitHub] File list unavailable for {commit.sha[:7]}: {e.status}")
+            return []
+
+    def _fetch_commit_files(self, record):
+        """
+        Loads the changed files of a GraphQL record (one REST request per commit).
+        Returns None when the request budget only covers listing calls any more.
+        """
+        url = f"{self.base_url}/repos/{record['repo']}/commits/{record['id']}"
+        if not scheduler.has_budget(url):
+            return None
+        with profiler.span('github.commit_files'):
+            for attempt in range(self.max_retries):
+                try:
+                    commit = self.client.get_repo(record['repo'], lazy=True).get_commit(record['id'])
+                    return self._commit_files(commit)
+                except RateLimitExceededException:
+                    self._wait_for_rate_limit(attempt)
+                except GithubException as e:
+                    print(f"[GitHub] File list unavailable for {record['id'][:7]}: {e.status}")
+                    return []
+        return None
+
+    def _enrich_files(self, records):
+        """Adds the changed files of every GraphQL record, fetched concurrently."""
+        # Records already in the cache keep their stored files
+        if self.cache:
+            records = (r for r in records if not self.cache.has_record(self.cache_key, self.user.login, r['id']))
+        records = list(records)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            skipped = 0
+            for record, files in zip(records, pool.map(self._fetch_commit_files, records)):
+                if files is None:
+                    # Counted without file stats; the cache fetches it again next run
+                    record['partial'] = True
+                    skipped += 1
+                else:
+                    record['files'] = files
+                yield record
+
+        if skipped:
+            print(f"[GitHub] Rate-limit budget low: {skipped} commits counted without file stats")
+
+    def _fetch_records(self, since: date, year: int):
+        if self.engine == 'graphql':
+            graphql = GitHubGraphQLClient(self.token, self.graphql_url, self.max_retries)
+            records = graphql.fetch_commit_records(self.user.login, since, year)
+            return self._enrich_files(records) if self.file_stats else records
+        return self._fetch_rest_records(since, year)
+
+    def _search_window(self, start: date, end: date):
+        """Runs the commit search for one committer-date window; returns (results, first page)."""
+        query = f"author:{self.user.login} committer-date:{start.isoformat()}..{end.isoformat()}"
+        results = self.client.search_commits(query)
+        # The first page also carries total_count: no separate counting request
+        return results, results.get_page(0)
+
+    def _plan_search_shards(self, since: date, end: date, pool):
+        """
+        Splits since..end into committer-date windows of at most SEARCH_CAP results.
+        Windows over the cap are bisected until they fit or span a single day.
+        Returns [(results, first page)] in date order.
+        """
+        results, first = self._search_window(since, end)
+        if results.totalCount <= SEARCH_CAP:
+            return [(results, first)]
+
+        # Assume an even spread for the first split, leaving room for busy periods
+        days = (end - since).days + 1
+        size = max(math.ceil(days / math.ceil(results.totalCount * 1.25 / SEARCH_CAP)), 1)
+        pending = [(start, min(start + timedelta(days=size - 1), end))
+                   for start in (since + timedelta(days=d) for d in range(0, days, size))]
+        print(f"[GitHub] {results.totalCount} commits exceed the search cap, splitting into {len(pending)} windows...")
+
+        shards = {}
+        while pending:
+            probes = pool.map(lambda window: self._search_window(*window), pending)
+            split = []
+            for (start, end), (results, first) in zip(pending, probes):
+                if results.totalCount > SEARCH_CAP and start < end:
+                    mid = start + timedelta(days=(end - start).days // 2)
+                    split += [(start, mid), (mid + timedelta(days=1), end)]
+                else:
+                    if results.totalCount > SEARCH_CAP:
+                        print(f"[GitHub] {results.totalCount} commits on {start}: only {SEARCH_CAP} are searchable")
+                    shards[start] = (results, first)
+            pending = split
+        return [shards[start] for start in sorted(shards)]
+
+    def _search_commits(self, since: date, end: date):
+        """Every commit of the window, searched in date shards fetched concurrently and deduplicated by SHA."""
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            shards = self._plan_search_shards(since, end, pool)
+
+            # Remaining pages of every shard, all in one concurrent batch
+            per_page = self.client.per_page
+            pages = [(results, page) for results, _ in shards
+                     for page in range(1, math.ceil(min(results.totalCount, SEARCH_CAP) / per_page))]
+            fetched = pool.map(lambda task: task[0].get_page(task[1]), pages)
+            rest = {}
+            for (results, _), items in zip(pages, fetched):
+                rest.setdefault(id(results), []).extend(items)
+
+        commits = {}
+        for results, first in shards:
+            for commit in first + rest.get(id(results), []):
+                commits.setdefault(commit.sha, commit)
+        return list(commits.values())
+
+    def _fetch_rest_records(self, since: date, year: int):
+        """Searches commits from `since` to the end of `year` and yields normalized records."""
+        commits = self._search_commits(since, date(year, 12, 31))
+
+        # Commits already in the cache do not pay for a detail request again.
+        if self.cache:
+            commits = [c for c in commits if not self.cache.has_record(self.cache_key, self.user.login, c.sha)]
+
+        # Commit details are fetched concurrently; executor.map yields results
+        # in submission order, so the output stays deterministic.
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            details = pool.map(self._fetch_commit_details, commits)
+
+            skipped = 0
+            for commit, detail in zip(commits, details):
+                record = {
+                    'id': commit.sha,
+                    'date': commit.commit.author.date.isoformat(),
+                    'repo': commit.repository.full_name,
+                    'message': commit.commit.message,
+                    'additions': 0,
+                    'deletions': 0,
+                    'files': [],
+                }
+                if detail is None:
+                    # Counted without line stats; the cache fetches it again next run
+                    record['partial'] = True
+                    skipped += 1
+                else:
+                    record['additions'], record['deletions'], record['files'] = detail
+                yield record
+
+        if skipped:
+            print(f"[GitHub] Rate-limit budget low: {skipped} commits counted without line stats")
+
+    def get_year_events(self, year: int) -> CommitEvents:
+        if not self.user:
+            self.connect()
+
+        print(f"[GitHub] Querying data for {year} ({self.engine.upper()} engine)...")
+        fetch = lambda since: self._fetch_records(since, year)
+        with profiler.span('github.fetch'):
+            if self.cache:
+                records = self.cache.sync(self.cache_key, self.user.login, year, fetch)
+            else:
+                records = list(fetch(date(year, 1, 1)))
+
+        with profiler.span('github.events'):
+            events, fallback = self._build_events(records)
+
+        # Whole-repository ratios only stand in for commits without a known-language file
+        repos = {f"{self.cache_key}:{name}": name for name in fallback}
+        with profiler.span('github.languages'):
+            self.languages.prefetch(repos, lambda key: self._load_repo_languages(repos[key]), self.max_workers)
+        for repo_name in fallback:
+            events.set_project_languages(repo_name, self._get_repo_languages(repo_name))
+        return events
+
+    def _build_events(self, records):
+        """Returns the records as CommitEvents, with the repositories having commits of unknown languages."""
+        events = CommitEvents()
+        fallback = {}
+
+        # Commit types are classified in one batch
+        types = classify_commits([r['message'] for r in records])
+        for record, ctype in zip(records, types):
+            # Extensions weighted by lines changed; languages from the touched files
+            extensions, languages = summarize_files(record['files'])
+            events.add(record['date'], record['repo'], additions=record['additions'],
+                       deletions=record['deletions'], commit_type=ctype, extensions=extensions, languages=languages)
+            if not languages:
+                fallback[record['repo']] = True
+        return events, list(fallback)
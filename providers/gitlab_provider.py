@@ -1,21 +1,40 @@
 import gitlab
-from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone, date, timedelta
 from .base import GitProvider
 from utils.classify import classify_commit
+from utils.events import CommitEvents
+from utils.profiling import profiler
+from utils.ratelimit import scheduler
+from utils.cache import LanguageCache
 
 class GitLabProvider(GitProvider):
-    def __init__(self, url: str, token: str):
+    def __init__(self, url: str, token: str, cache=None, lang_cache=None, max_workers: int = 8,
+                 username: str = None, line_stats: bool = False):
+        self.name = f"GitLab ({url})"
         self.url = url
         self.token = token
+        self.cache = cache
+        self.languages = lang_cache or LanguageCache(None)
+        self.max_workers = max_workers
+        self.line_stats = line_stats
+        self.username = username
         self.client = None
         self.user = None
-        self._lang_cache = {}
 
     def connect(self):
         try:
-            self.client = gitlab.Gitlab(self.url, private_token=self.token)
-            self.client.auth()
-            self.user = self.client.user
+            if not self.client:
+                scheduler.install()
+                self.client = gitlab.Gitlab(self.url, private_token=self.token)
+                self.client.auth()
+            if self.username:
+                matches = self.client.users.list(username=self.username)
+                if not matches:
+                    raise ValueError(f"unknown user {self.username}")
+                self.user = matches[0]
+            else:
+                self.user = self.client.user
             print(f"[GitLab] Connected as: {self.user.username}")
         except Exception as e:
             raise ConnectionError(f"GitLab connection error: {e}")
@@ -23,74 +42,191 @@ class GitLabProvider(GitProvider):
     def get_user_info(self) -> str:
         return f"{self.user.name} (@{self.user.username})"
 
-    def _get_language_breakdown(self, project_id):
-        if project_id in self._lang_cache:
-            return self._lang_cache[project_id]
+    def _lang_key(self, project_id):
+        return f"gitlab:{self.url}:{project_id}"
 
+    def _load_language_breakdown(self, project_id):
+        # Optional enrichment: skipped (and retried next run) when the budget is low
+        if not scheduler.has_budget(f"{self.url}/api/v4/projects/{project_id}/languages"):
+            return None
         try:
-            p = self.client.projects.get(project_id)
+            # lazy=True skips the project GET: languages() is a single request
+            p = self.client.projects.get(project_id, lazy=True)
             langs = p.languages()
             total = sum(langs.values())
 
             if total == 0:
                 return {"Unknown": 1.0}
 
-            breakdown = {k: v / total for k, v in langs.items()}
-            self._lang_cache[project_id] = breakdown
-            return breakdown
+            return {k: v / total for k, v in langs.items()}
         except:
-            self._lang_cache[project_id] = {"Unknown": 1.0}
-            return {"Unknown": 1.0}
-
-    def get_year_stats(self, year: int) -> dict:
-        if not self.client:
-            self.connect()
+            return None
 
-        print(f"[GitLab] Querying data for {year} (Fast Mode)...")
-        start_date = datetime(year, 1, 1).isoformat()
-        end_date = datetime(year, 12, 31).isoformat()
-
-        stats = {
-            'total_commits': 0,
-            'projects_count': 0,
-            # GitLab Events API does not support line diffs efficiently
-            'lines_added': 0,
-            'lines_deleted': 0,
-            'commits_by_month': {i: 0 for i in range(1, 13)},
-            'commits_by_hour': {i: 0 for i in range(24)},
-            'languages': {},
-            'dates': set(),
-            'punch_card': {},
-            'extensions': {},
-            'weekly_activity': {i: 0 for i in range(1, 54)},
-            'daily_projects': {},
-            'daily_commits': {},
-            'commit_types': {},
-            '_temp_projects': set()
-        }
-
-        # Retrieve Push events only
-        events = self.client.events.list(
-            after=start_date, before=end_date, action='pushed', all=True
+    def _get_language_breakdown(self, project_id):
+        return self.languages.get(self._lang_key(project_id)) or {"Unknown": 1.0}
+
+    def _fetch_records(self, since: date, year: int):
+        """Lists push events from `since` to the end of `year` as normalized records."""
+        # 'after' and 'before' are exclusive day bounds in the Events API
+        after = (since - timedelta(days=1)).isoformat()
+        before = date(year + 1, 1, 1).isoformat()
+
+        # Retrieve Push events only, streamed page by page. GitLab falls back
+        # to offset pagination where keyset is not supported.
+        manager = self.user.events if self.username else self.client.events
+        events = manager.list(
+            after=after, before=before, action='pushed', sort='asc',
+            iterator=True, pagination='keyset', per_page=100
         )
 
-        print(f"[GitLab] Analyzing {len(events)} push events...")
-
         for event in events:
-            project_id = event.project_id
-            stats['_temp_projects'].add(project_id)
+            yield {
+                'id': event.id,
+                'date': event.created_at,
+                'project_id': event.project_id,
+                'push_data': getattr(event, 'push_data', None),
+            }
+
+    def _list_push_commits(self, project_id, push_data):
+        """Lists the commits of one push with their line stats, in a single paginated call."""
+        commit_from = push_data.get('commit_from')
+        commit_to = push_data.get('commit_to')
+        count = push_data['commit_count']
+        if not commit_to or not count:
+            return []
+
+        project = self.client.projects.get(project_id, lazy=True)
+        if commit_from and commit_from.strip('0'):
+            ref_name = f"{commit_from}..{commit_to}"
+        else:
+            # New branch: no base commit, take the last `count` commits of its head
+            ref_name = commit_to
+        commits = project.commits.list(ref_name=ref_name, with_stats=True, iterator=True,
+                                       per_page=min(count, 100))
+
+        result = []
+        for commit in commits:
+            stats = getattr(commit, 'stats', None) or {}
+            result.append((commit.id, stats.get('additions', 0), stats.get('deletions', 0)))
+            if len(result) >= count:
+                break
+        return result
+
+    def _fetch_push_commits(self, pushes):
+        """
+        Enriches pushes ({project_id: [(event_id, push_data)]}) concurrently, one
+        worker per project. Returns {event_id: [(sha, additions, deletions)]}.
+        """
+        def fetch_project(project_id):
+            found = {}
+            for event_id, push_data in pushes[project_id]:
+                # Pushes left out here are not cached and are fetched again next run
+                if not scheduler.has_budget(f"{self.url}/api/v4/projects/{project_id}/repository/commits"):
+                    break
+                try:
+                    found[event_id] = self._list_push_commits(project_id, push_data)
+                except gitlab.exceptions.GitlabError as e:
+                    print(f"[GitLab] Line stats unavailable for push {event_id} of project {project_id}: {e}")
+                    if e.response_code == 404:
+                        # Unreachable range (force-pushed or garbage-collected): cached as empty
+                        found[event_id] = []
+            return found
+
+        results = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            for found in pool.map(fetch_project, pushes):
+                results.update(found)
+        return results
+
+    def _add_line_stats(self, events, pushes, rows):
+        cache_key = f"gitlab:{self.url}"
+        event_ids = [event_id for pushed in pushes.values() for event_id, _ in pushed]
+        known = self.cache.get_push_commits(cache_key, event_ids) if self.cache else {}
+
+        missing = {}
+        for project_id, pushed in pushes.items():
+            todo = [(event_id, push_data) for event_id, push_data in pushed if str(event_id) not in known]
+            if todo:
+                missing[project_id] = todo
+        if missing:
+            self.report_progress(f"[GitLab] Fetching line stats for {sum(map(len, missing.values()))} pushes...")
+        with profiler.span('gitlab.push_commits'):
+            fetched = self._fetch_push_commits(missing)
+        if self.cache:
+            self.cache.put_push_commits(cache_key, fetched)
+        left_out = sum(map(len, missing.values())) - len(fetched)
+        if left_out:
+            print(f"[GitLab] Line stats missing for {left_out} pushes (rate-limit budget or errors)")
+
+        # Keyed by SHA: a commit pushed to several branches is counted once,
+        # on the earliest push that contains it
+        by_sha = {}
+        for event_id, commits in list(known.items()) + list(fetched.items()):
+            row = rows[str(event_id)]
+            for sha, additions, deletions in commits:
+                if sha not in by_sha or row < by_sha[sha][0]:
+                    by_sha[sha] = (row, additions, deletions)
+        for row, additions, deletions in by_sha.values():
+            events.add_lines(row, additions, deletions)
+
+    def get_year_events(self, year: int) -> CommitEvents:
+        if not self.user:
+            self.connect()
 
-            if not hasattr(event, 'push_data'):
+        print(f"[GitLab] Querying data for {year} (Fast Mode)...")
+        with profiler.span('gitlab.events'):
+            events, pushes, rows, projects = self._collect_events(year)
+
+        if self.line_stats:
+            with profiler.span('gitlab.line_stats'):
+                self._add_line_stats(events, pushes, rows)
+
+        # Languages: resolved once per project after the stream
+        project_keys = {self._lang_key(p): p for p in projects}
+        with profiler.span('gitlab.languages'):
+            self.languages.prefetch(project_keys, lambda key: self._load_language_breakdown(project_keys[key]),
+                                    self.max_workers)
+        for project_id in projects:
+            events.set_project_languages(project_id, self._get_language_breakdown(project_id))
+
+        return events
+
+    def _collect_events(self, year):
+        """
+        Streams the year's push events into a CommitEvents; returns it with the
+        pushes to enrich ({project_id: [(event_id, push_data)]}), each push's
+        row and the projects pushed to.
+        """
+        fetch = lambda since: self._fetch_records(since, year)
+        if self.cache:
+            records = self.cache.stream(f"gitlab:{self.url}", self.user.username, year, fetch)
+        else:
+            records = fetch(date(year, 1, 1))
+
+        # GitLab Events API does not support line diffs efficiently: unless
+        # line_stats is enabled, lines_added/lines_deleted stay at zero.
+        events = CommitEvents()
+        pushes = {}
+        rows = {}
+        pushed_projects = {}
+        events_count = 0
+
+        # Records are reduced to event rows as pages arrive; nothing below keeps them around
+        for record in records:
+            events_count += 1
+            if events_count % 100 == 0:
+                self.report_progress(f"[GitLab] {events_count} push events processed...")
+
+            project_id = record['project_id']
+            dt_utc = datetime.strptime(record['date'], '%Y-%m-%dT%H:%M:%S.%fZ').replace(tzinfo=timezone.utc)
+
+            push_data = record['push_data']
+            if not push_data:
+                # Counts as a project of the year, without activity
+                events.add(dt_utc, project_id, commits=0, active=False)
                 continue
 
-            commit_count = event.push_data['commit_count']
-            stats['total_commits'] += commit_count
-
-            dt_utc = datetime.strptime(event.created_at, '%Y-%m-%dT%H:%M:%S.%fZ').replace(tzinfo=timezone.utc)
-            dt_local = dt_utc.astimezone()
-
-            date_str = dt_local.strftime('%Y-%m-%d')
-            week_num = dt_local.isocalendar()[1]
+            commit_count = push_data['commit_count']
 
             # Heuristic: Cap daily contribution for massive pushes to avoid
             # skewing daily statistics (e.g., initial imports or merges).
@@ -98,35 +234,14 @@ class GitLabProvider(GitProvider):
             if commit_count > 20:
                 effective_daily_count = 1
 
-            # Populate Stats
-            stats['dates'].add(date_str)
-            stats['commits_by_month'][dt_local.month] += effective_daily_count
-            stats['commits_by_hour'][dt_local.hour] += effective_daily_count
-            stats['weekly_activity'][week_num] = stats['weekly_activity'].get(week_num, 0) + effective_daily_count
-
-            # Punch Card
-            pc_key = (dt_local.weekday(), dt_local.hour)
-            stats['punch_card'][pc_key] = stats['punch_card'].get(pc_key, 0) + effective_daily_count
-
-            # Record Daily Commits
-            stats['daily_commits'][date_str] = stats['daily_commits'].get(date_str, 0) + effective_daily_count
-
-            # Context Switcher
-            if date_str not in stats['daily_projects']:
-                stats['daily_projects'][date_str] = set()
-            stats['daily_projects'][date_str].add(project_id)
-
-            # Commit Types
-            title = event.push_data.get('commit_title')
-            ctype = classify_commit(title)
-            stats['commit_types'][ctype] = stats['commit_types'].get(ctype, 0) + commit_count
-
-            # Languages
-            breakdown = self._get_language_breakdown(project_id)
-            for lang, ratio in breakdown.items():
-                stats['languages'][lang] = stats['languages'].get(lang, 0) + (commit_count * ratio)
+            title = push_data.get('commit_title')
+            row = events.add(dt_utc, project_id, commits=commit_count, weight=effective_daily_count,
+                             commit_type=classify_commit(title))
+            pushed_projects[project_id] = True
 
-        stats['projects_count'] = len(stats['_temp_projects'])
-        del stats['_temp_projects']
+            if self.line_stats and commit_count:
+                pushes.setdefault(project_id, []).append((record['id'], push_data))
+                rows[str(record['id'])] = row
 
-        return stats
\ No newline at end of file
+        print(f"[GitLab] Analyzed {events_count} push events.")
+        return events, pushes, rows, list(pushed_projects)
@@ -0,0 +1,143 @@
+import multiprocessing
+import os
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+from itertools import repeat
+from .base import GitProvider
+from utils.classify import classify_commit
+from utils.events import CommitEvents
+from utils.languages import summarize_files
+from utils.profiling import profiler
+from utils.stats import YearStats
+
+RECORD_SEP = '\x1e'
+FIELD_SEP = '\x1f'
+
+
+def _git(*args, cwd=None):
+    result = subprocess.run(['git', *args], cwd=cwd, capture_output=True, text=True)
+    return result.stdout.strip() if result.returncode == 0 else ''
+
+
+def discover_repositories(paths):
+    """Expands each path to itself when it is a git repository, else to its direct child repositories."""
+    repositories = []
+    for path in paths:
+        path = os.path.abspath(os.path.expanduser(path))
+        if os.path.exists(os.path.join(path, '.git')):
+            repositories.append(path)
+        elif os.path.isdir(path):
+            for child in sorted(os.listdir(path)):
+                if os.path.exists(os.path.join(path, child, '.git')):
+                    repositories.append(os.path.join(path, child))
+    return repositories
+
+
+def _add_commit(events, commit, project):
+    when, subject, files = commit
+    extensions, languages = summarize_files(files)
+    events.add(when, project, additions=sum(f[1] for f in files), deletions=sum(f[2] for f in files),
+               commit_type=classify_commit(subject), extensions=extensions, languages=languages)
+
+
+def scan_repository(path, author_emails, year) -> CommitEvents:
+    """
+    Collects one repository's commits around `year` in a single streaming
+    pass over `git log --numstat`. Commits are kept with their author time
+    zone's instant, so the year is only cut at aggregation time.
+    """
+    events = CommitEvents()
+    # Keyed on the full path: clones sharing a folder name stay separate projects
+    project = path
+
+    # --since filters on committer date; the author date is checked at aggregation
+    cmd = ['git', '-C', path, 'log', '--all', '--no-merges', '--numstat', '--no-renames',
+           f"--since={year - 1}-12-31", f"--format={RECORD_SEP}%H{FIELD_SEP}%aI{FIELD_SEP}%s"]
+    if author_emails:
+        # --author matches "Name <email>": the brackets keep me@x.io from matching xme@x.io.au
+        cmd += ['--fixed-strings'] + [f"--author=<{email}>" for email in author_emails]
+
+    process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                               text=True, encoding='utf-8', errors='replace')
+    commit = None
+    for line in process.stdout:
+        if line.startswith(RECORD_SEP):
+            if commit:
+                _add_commit(events, commit, project)
+            _, authored, subject = line[1:].rstrip('\n').split(FIELD_SEP, 2)
+            commit = (datetime.fromisoformat(authored), subject, [])
+        elif commit and line.strip():
+            # numstat: "<added>\t<deleted>\t<path>", '-' for binary files
+            added, deleted, filename = line.rstrip('\n').split('\t', 2)
+            commit[2].append((filename, 0 if added == '-' else int(added), 0 if deleted == '-' else int(deleted)))
+    if commit:
+        _add_commit(events, commit, project)
+
+    _, stderr = process.communicate()
+    if process.returncode != 0:
+        raise RuntimeError(f"git log failed in {path}: {stderr.strip()}")
+    return events
+
+
+class LocalGitProvider(GitProvider):
+    """
+    Reads activity from repositories checked out on disk, without any network access.
+    Each repository is scanned in its own worker process. In batch mode,
+    the usernames must be author emails.
+    """
+
+    def __init__(self, paths, author_emails=None, max_workers: int = None):
+        self.name = "Local"
+        self.paths = paths
+        self.author_emails = author_emails or []
+        self.max_workers = max_workers
+        self.repositories = []
+        self.username = None
+        self.user = None
+        # No API client: kept for callers that share clients between copies
+        self.client = None
+
+    def for_user(self, username: str):
+        """
+        Returns a copy counting the commits authored with `username`, which
+        must be an email: clones carry no account names to map logins to.
+        """
+        if '@' not in username:
+            raise ValueError(f"local repositories can only be attributed to an author email, not '{username}'")
+        clone = super().for_user(username)
+        clone.author_emails = [username]
+        return clone
+
+    def connect(self):
+        self.repositories = discover_repositories(self.paths)
+        if not self.repositories:
+            raise ConnectionError(f"No git repositories found in: {', '.join(self.paths)}")
+        if not self.author_emails:
+            email = _git('config', 'user.email')
+            if not email:
+                raise ConnectionError("No author email configured (LOCAL_AUTHOR_EMAIL or git user.email)")
+            self.author_emails = [email]
+        self.user = self.username or _git('config', 'user.name') or self.author_emails[0]
+        print(f"[Local] Found {len(self.repositories)} repositories for {', '.join(self.author_emails)}")
+
+    def get_user_info(self) -> str:
+        return f"{self.user} ({', '.join(self.author_emails)})"
+
+    def get_year_events(self, year: int) -> CommitEvents:
+        if not self.repositories:
+            self.connect()
+
+        print(f"[Local] Scanning {len(self.repositories)} repositories for {year}...")
+        # Spawned workers: forking while other providers' threads run can deadlock the children
+        spawn = multiprocessing.get_context('spawn')
+        with profiler.span('local.scan'), ProcessPoolExecutor(max_workers=self.max_workers, mp_context=spawn) as pool:
+            partials = list(pool.map(scan_repository, self.repositories,
+                                     repeat(self.author_emails), repeat(year)))
+        return CommitEvents.concat(partials)
+
+    def get_year_stats(self, year: int) -> YearStats:
+        # git log cannot filter on author date: the year is cut in local time here
+        events = self.get_year_events(year)
+        with profiler.span('events.aggregate'):
+            return events.aggregate(year, start=date(year, 1, 1), end=date(year, 12, 31))
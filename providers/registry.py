@@ -0,0 +1,64 @@
+import os
+import re
+
+# name -> (env prefix, factory(env, suffix, **shared))
+PROVIDERS = {}
+
+
+def register_provider(name: str, env_prefix: str, required: str = 'TOKEN'):
+    """
+    Registers a provider factory. An instance is built for every
+    '{env_prefix}_{required}{suffix}' variable found in the environment, so
+    several instances of the same provider can run side by side
+    (e.g. GITLAB_TOKEN and GITLAB_TOKEN_WORK with GITLAB_URL_WORK).
+    """
+    def decorator(factory):
+        PROVIDERS[name] = (env_prefix, required, factory)
+        return factory
+    return decorator
+
+
+def build_providers(env, **shared):
+    providers = []
+    for env_prefix, required, factory in PROVIDERS.values():
+        token_var = f"{env_prefix}_{required}"
+        suffixes = sorted(k[len(token_var):] for k, v in env.items()
+                          if v and re.fullmatch(rf"{token_var}(_\w+)?", k))
+        for suffix in suffixes:
+            provider = factory(env, suffix, **shared)
+            # The suffix keeps instance names unique: they label logs, snapshots and selections
+            if suffix:
+                provider.name = f"{provider.name} [{suffix.lstrip('_')}]"
+            provider.timeout = float(env.get(f"{env_prefix}_TIMEOUT{suffix}", env.get('PROVIDER_TIMEOUT', 900)))
+            providers.append(provider)
+    return providers
+
+
+@register_provider('gitlab', 'GITLAB')
+def _build_gitlab(env, suffix, cache=None, lang_cache=None):
+    from .gitlab_provider import GitLabProvider
+    return GitLabProvider(env.get(f"GITLAB_URL{suffix}", 'https://gitlab.com'), env[f"GITLAB_TOKEN{suffix}"],
+                          line_stats=env.get(f"GITLAB_LINE_STATS{suffix}", env.get('GITLAB_LINE_STATS')) == '1',
+                          cache=cache, lang_cache=lang_cache)
+
+
+@register_provider('github', 'GITHUB')
+def _build_github(env, suffix, cache=None, lang_cache=None):
+    from .github_provider import GitHubProvider
+    return GitHubProvider(env[f"GITHUB_TOKEN{suffix}"],
+                          base_url=env.get(f"GITHUB_URL{suffix}", 'https://api.github.com'),
+                          max_workers=int(env.get(f"GITHUB_WORKERS{suffix}", env.get('GITHUB_WORKERS', 8))),
+                          engine=env.get(f"GITHUB_ENGINE{suffix}", env.get('GITHUB_ENGINE', 'rest')),
+                          # Never falls back to the unsuffixed URL: derived from the instance's GITHUB_URL
+                          graphql_url=env.get(f"GITHUB_GRAPHQL_URL{suffix}") or None,
+                          file_stats=env.get(f"GITHUB_FILE_STATS{suffix}", env.get('GITHUB_FILE_STATS')) == '1',
+                          cache=cache, lang_cache=lang_cache)
+
+
+@register_provider('local', 'LOCAL', required='REPOS')
+def _build_local(env, suffix, cache=None, lang_cache=None):
+    from .local_provider import LocalGitProvider
+    emails = env.get(f"LOCAL_AUTHOR_EMAIL{suffix}", env.get('LOCAL_AUTHOR_EMAIL', ''))
+    return LocalGitProvider(env[f"LOCAL_REPOS{suffix}"].split(os.pathsep),
+                            [e.strip() for e in emails.split(',') if e.strip()],
+                            max_workers=int(env.get('LOCAL_WORKERS', os.cpu_count())))
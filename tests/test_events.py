@@ -0,0 +1,75 @@
+"""CommitEvents.aggregate() against a per-record reference built with datetime and zoneinfo."""
+from datetime import date, datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pytest
+
+from utils.events import CommitEvents
+from utils.stats import YearStats
+
+YEAR = 2024
+
+ZONES = ['UTC', 'America/New_York', 'Europe/London', 'Australia/Lord_Howe', 'Asia/Kolkata', 'Pacific/Chatham']
+
+
+def _around(moment, hours=6, step=timedelta(minutes=7)):
+    start = moment - timedelta(hours=hours)
+    return [start + step * i for i in range(int(2 * timedelta(hours=hours) / step))]
+
+
+def _timestamps():
+    utc = timezone.utc
+    moments = []
+    # DST transitions: US (Mar 10, Nov 3), EU (Mar 31, Oct 27), Lord Howe (Apr 7, Oct 6), Chatham (Apr 7, Sep 29)
+    for day in [(3, 10), (11, 3), (3, 31), (10, 27), (4, 6), (10, 5), (9, 28)]:
+        moments += _around(datetime(YEAR, *day, 14, tzinfo=utc), hours=24)
+    # Year boundaries, including the days that spill into the neighbouring years
+    for year in (YEAR, YEAR + 1):
+        moments += _around(datetime(year, 1, 1, tzinfo=utc), hours=40)
+    return sorted({int(m.timestamp()) for m in moments})
+
+
+def _reference(times, tz):
+    """Buckets each record on its own, the way a per-commit loop would."""
+    stats = YearStats(YEAR)
+    for t in times:
+        local = datetime.fromtimestamp(t, tz=ZoneInfo(tz))
+        stats.months[local.month] += 1
+        stats.hours[local.hour] += 1
+        stats.weeks[local.isocalendar()[1]] += 1
+        stats.punch_card[local.weekday(), local.hour] += 1
+        slot = local.date().toordinal() - stats._origin
+        if 0 <= slot < YearStats.DAY_SLOTS:
+            stats.days[slot] += 1
+            stats.active[slot] = True
+    return stats
+
+
+@pytest.fixture(scope='module')
+def events():
+    store = CommitEvents()
+    for t in _timestamps():
+        store.add(t, 'project')
+    return store
+
+
+@pytest.mark.parametrize('tz', ZONES)
+def test_aggregate_matches_reference(events, tz):
+    stats = events.aggregate(YEAR, tz)
+    expected = _reference(_timestamps(), tz)
+
+    assert stats.total_commits == len(_timestamps())
+    for field in ('months', 'hours', 'weeks', 'punch_card', 'days', 'active'):
+        np.testing.assert_array_equal(getattr(stats, field), getattr(expected, field), err_msg=field)
+
+
+@pytest.mark.parametrize('tz', ZONES)
+def test_date_range_uses_local_days(events, tz):
+    start, end = date(YEAR, 1, 1), date(YEAR, 12, 31)
+    stats = events.aggregate(YEAR, tz, start=start, end=end)
+    inside = [t for t in _timestamps()
+              if start <= datetime.fromtimestamp(t, tz=ZoneInfo(tz)).date() <= end]
+
+    assert stats.total_commits == len(inside)
+    np.testing.assert_array_equal(stats.hours, _reference(inside, tz).hours)
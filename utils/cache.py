@@ -0,0 +1,213 @@
+import json
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from .profiling import profiler
+
+
+class ResponseCache:
+    """
+    Local SQLite store of normalized provider records.
+    Records are keyed by (provider, user, id) and must carry an 'id' and a
+    UTC ISO 'date' field. A per-year watermark remembers up to which day the
+    provider has been fully queried, so later runs only fetch newer items.
+    Records flagged 'partial' (enrichment skipped) are not stored and hold
+    the watermark back, so the next run fetches them again.
+    """
+
+    def __init__(self, path: str = '.devwrapped_cache.db'):
+        self.path = path
+        self._lock = threading.Lock()
+        # The timeout lets several batch processes share the database file
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS records (
+                    provider TEXT, user TEXT, year INTEGER, id TEXT, date TEXT, payload TEXT,
+                    PRIMARY KEY (provider, user, id)
+                )""")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS push_commits (
+                    provider TEXT, event_id TEXT, sha TEXT, additions INTEGER, deletions INTEGER,
+                    PRIMARY KEY (provider, event_id, sha)
+                )""")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS watermarks (
+                    provider TEXT, user TEXT, year INTEGER, fetched_until TEXT,
+                    PRIMARY KEY (provider, user, year)
+                )""")
+
+    def get_watermark(self, provider, user, year):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT fetched_until FROM watermarks WHERE provider=? AND user=? AND year=?",
+                (provider, user, year)).fetchone()
+        return date.fromisoformat(row[0]) if row else None
+
+    def set_watermark(self, provider, user, year, day: date):
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO watermarks VALUES (?, ?, ?, ?)",
+                               (provider, user, year, day.isoformat()))
+
+    def has_record(self, provider, user, record_id) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM records WHERE provider=? AND user=? AND id=?",
+                (provider, user, str(record_id))).fetchone()
+        return row is not None
+
+    def put_records(self, provider, user, year, records):
+        rows = [(provider, user, year, str(r['id']), r['date'], json.dumps(r)) for r in records]
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?, ?, ?)", rows)
+        return len(rows)
+
+    def iter_records(self, provider, user, year, batch_size: int = 500):
+        """Streams the stored records of a year without loading them all at once."""
+        # A dedicated connection keeps this cursor independent from concurrent writes
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            cursor = conn.execute(
+                "SELECT payload FROM records WHERE provider=? AND user=? AND year=? ORDER BY date, id",
+                (provider, user, year))
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for (payload,) in rows:
+                    yield json.loads(payload)
+        finally:
+            conn.close()
+
+    def stream(self, provider, user, year, fetch, batch_size: int = 500):
+        """
+        Yields every record of the year: first the ones fetched from the provider,
+        as they arrive, then the previously cached ones.
+        fetch(since) must return the records dated on or after `since`.
+        """
+        start = date(year, 1, 1)
+        end = date(year, 12, 31)
+        since = self.get_watermark(provider, user, year) or start
+        fresh_ids = set()
+
+        if since <= end:
+            today = date.today()
+            batch = []
+            first_partial = None
+            for record in fetch(since):
+                fresh_ids.add(str(record['id']))
+                if record.get('partial'):
+                    day = date.fromisoformat(record['date'][:10])
+                    first_partial = min(first_partial or day, day)
+                else:
+                    batch.append(record)
+                yield record
+                if len(batch) >= batch_size:
+                    self.put_records(provider, user, year, batch)
+                    batch = []
+            self.put_records(provider, user, year, batch)
+
+            # A finished year is complete: mark it so it is never queried again.
+            # Otherwise re-query from yesterday to absorb timezone skew.
+            until = end + timedelta(days=1) if today > end else today - timedelta(days=1)
+            if first_partial:
+                until = min(until, first_partial)
+            self.set_watermark(provider, user, year, max(until, start))
+            print(f"[Cache] {provider}: {len(fresh_ids)} records fetched since {since}")
+        profiler.count('cache.records.miss', len(fresh_ids))
+
+        for record in self.iter_records(provider, user, year):
+            if str(record['id']) not in fresh_ids:
+                profiler.count('cache.records.hit')
+                yield record
+
+    def get_push_commits(self, provider, event_ids):
+        """Returns {event_id: [(sha, additions, deletions)]} for the pushes already enriched."""
+        event_ids = [str(e) for e in event_ids]
+        found = {}
+        with self._lock:
+            for i in range(0, len(event_ids), 500):
+                chunk = event_ids[i:i + 500]
+                rows = self._conn.execute(
+                    f"SELECT event_id, sha, additions, deletions FROM push_commits "
+                    f"WHERE provider=? AND event_id IN ({','.join('?' * len(chunk))})",
+                    [provider, *chunk]).fetchall()
+                for event_id, sha, additions, deletions in rows:
+                    commits = found.setdefault(event_id, [])
+                    if sha:
+                        commits.append((sha, additions, deletions))
+        profiler.count('cache.push_commits.hit', len(found))
+        profiler.count('cache.push_commits.miss', len(set(event_ids)) - len(found))
+        return found
+
+    def put_push_commits(self, provider, pushes):
+        """Stores {event_id: [(sha, additions, deletions)]}; pushes without commits get an empty-SHA marker row."""
+        rows = [(provider, str(event_id), sha, additions, deletions)
+                for event_id, commits in pushes.items()
+                for sha, additions, deletions in commits or [('', 0, 0)]]
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO push_commits VALUES (?, ?, ?, ?, ?)", rows)
+
+    def sync(self, provider, user, year, fetch):
+        """Brings the cached year up to date and returns all of its records."""
+        return sorted(self.stream(provider, user, year, fetch), key=lambda r: (r['date'], str(r['id'])))
+
+
+class LanguageCache:
+    """
+    Repository language breakdowns shared by every provider.
+    Entries are kept in memory for the hot loop and persisted to a SQLite
+    table, expiring after `ttl` seconds. A `path` of None keeps them in memory only.
+    """
+
+    def __init__(self, path: str = '.devwrapped_cache.db', ttl: float = 7 * 24 * 3600):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path or ':memory:', timeout=30, check_same_thread=False)
+        with self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS languages (
+                    key TEXT PRIMARY KEY, breakdown TEXT, fetched_at REAL
+                )""")
+            self._conn.execute("DELETE FROM languages WHERE fetched_at < ?", (time.time() - ttl,))
+        rows = self._conn.execute("SELECT key, breakdown, fetched_at FROM languages").fetchall()
+        self._entries = {key: (json.loads(breakdown), fetched_at) for key, breakdown, fetched_at in rows}
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            # Another process sharing the file may have stored it meanwhile
+            with self._lock:
+                row = self._conn.execute("SELECT breakdown, fetched_at FROM languages WHERE key=?",
+                                         (key,)).fetchone()
+            if row is None:
+                return None
+            entry = self._entries[key] = (json.loads(row[0]), row[1])
+        if entry[1] < time.time() - self.ttl:
+            return None
+        return entry[0]
+
+    def put(self, key, breakdown):
+        now = time.time()
+        self._entries[key] = (breakdown, now)
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO languages VALUES (?, ?, ?)",
+                               (key, json.dumps(breakdown), now))
+
+    def prefetch(self, keys, loader, max_workers: int = 8):
+        """
+        Loads every missing key concurrently with loader(key).
+        Loaders return None on failure; failures are not cached.
+        """
+        keys = list(dict.fromkeys(keys))
+        missing = [k for k in keys if self.get(k) is None]
+        profiler.count('cache.languages.hit', len(keys) - len(missing))
+        profiler.count('cache.languages.miss', len(missing))
+        if not missing:
+            return
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            for key, breakdown in zip(missing, pool.map(loader, missing)):
+                if breakdown is not None:
+                    self.put(key, breakdown)
@@ -1,10 +1,102 @@
+import json
+import os
+import re
+
+# Checked in order: a message starting with one of the 'prefixes' wins, then
+# a Conventional Commits type ("fix(parser)!: ..."), then the first rule with a
+# matching keyword. Prefixes and keywords match whole words and their
+# inflections ("add", "adds", "added", "adding"; "Merged PR 12: ...") but not
+# words containing them ("address").
+DEFAULT_RULES = [
+    {'type': 'Merge', 'prefixes': ['merge']},
+    {'type': 'Feature', 'conventional': ['feat'],
+     'keywords': ['feat', 'feature', 'add', 'new', 'create']},
+    {'type': 'Bugfix', 'conventional': ['fix'],
+     'keywords': ['fix', 'bug', 'bugfix', 'resolve', 'patch', 'hotfix']},
+    {'type': 'Refactor', 'conventional': ['refactor', 'chore', 'style', 'perf', 'build', 'ci'],
+     'keywords': ['chore', 'refactor', 'style', 'cleanup', 'remove']},
+    {'type': 'Docs', 'conventional': ['docs'],
+     'keywords': ['doc', 'docs', 'documentation', 'readme']},
+]
+
+DEFAULT_TYPE = 'Other'
+
+
+def _inflections(word):
+    word = re.escape(word.lower())
+    if word.endswith('e'):
+        return f"(?:{word}[sd]?|{word[:-1]}ing)"
+    return f"{word}(?:s|es|ed|ing)?"
+
+
+class CommitClassifier:
+    """
+    Classifies commit messages with a rule set compiled once into a single
+    regular expression. Only the first line of a message is considered.
+    """
+
+    def __init__(self, rules=None, default: str = DEFAULT_TYPE):
+        self.rules = rules or DEFAULT_RULES
+        self.default = default
+        self._memo = {}
+
+        # Group names encode the priority: prefixes, then conventional types, then keywords
+        self._types = {}
+        alternatives = []
+        for stage, key in enumerate(['prefixes', 'conventional', 'keywords']):
+            for index, rule in enumerate(self.rules):
+                words = rule.get(key)
+                if not words:
+                    continue
+                group = f"g{stage}_{index:03d}"
+                self._types[group] = rule['type']
+                if key == 'prefixes':
+                    alternatives.append(f"(?P<{group}>^\\s*(?:{'|'.join(map(_inflections, words))})\\b)")
+                elif key == 'conventional':
+                    alternatives.append(f"(?P<{group}>^\\s*(?:{'|'.join(map(re.escape, words))})(?:\\([^)]*\\))?!?:)")
+                else:
+                    alternatives.append(f"(?P<{group}>\\b(?:{'|'.join(map(_inflections, words))})\\b)")
+        self._pattern = re.compile('|'.join(alternatives), re.IGNORECASE)
+
+    @classmethod
+    def from_file(cls, path: str):
+        """Loads a JSON list of rules with the same shape as DEFAULT_RULES."""
+        with open(path) as f:
+            return cls(json.load(f))
+
+    def classify(self, message) -> str:
+        if not message:
+            return self.default
+        subject = message.split('\n', 1)[0]
+        ctype = self._memo.get(subject)
+        if ctype is None:
+            groups = [m.lastgroup for m in self._pattern.finditer(subject)]
+            ctype = self._types[min(groups)] if groups else self.default
+            if len(self._memo) < 100_000:
+                self._memo[subject] = ctype
+        return ctype
+
+    def classify_many(self, messages) -> list:
+        """Classifies a batch of messages; duplicates are only matched once."""
+        unique = {m: self.classify(m) for m in dict.fromkeys(messages)}
+        return [unique[m] for m in messages]
+
+
+_default_classifier = None
+
+
+def get_classifier() -> CommitClassifier:
+    """Shared classifier, built from the COMMIT_RULES JSON file when that variable is set."""
+    global _default_classifier
+    if _default_classifier is None:
+        path = os.getenv('COMMIT_RULES')
+        _default_classifier = CommitClassifier.from_file(path) if path else CommitClassifier()
+    return _default_classifier
+
+
 def classify_commit(message):
-    if not message:
-        return 'Other'
-    msg = message.lower()
-    if msg.startswith('merge'): return 'Merge'
-    if any(x in msg for x in ['feat', 'add', 'new', 'create']): return 'Feature'
-    if any(x in msg for x in ['fix', 'bug', 'resolve', 'patch', 'hotfix']): return 'Bugfix'
-    if any(x in msg for x in ['chore', 'refactor', 'style', 'cleanup', 'remove']): return 'Refactor'
-    if any(x in msg for x in ['doc', 'readme']): return 'Docs'
-    return 'Other'
\ No newline at end of file
+    return get_classifier().classify(message)
+
+
+def classify_commits(messages):
+    return get_classifier().classify_many(messages)
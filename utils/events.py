@@ -0,0 +1,288 @@
+from datetime import date, datetime, timezone
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+from .stats import YearStats
+
+# One row per commit, or per push for providers that only see pushes
+EVENT_DTYPE = np.dtype([
+    ('time', 'i8'),         # UTC epoch seconds
+    ('project', 'i4'),      # index into CommitEvents.projects
+    ('commits', 'i4'),      # commits represented by the event
+    ('weight', 'i4'),       # weight in the time buckets (may be capped below `commits`)
+    ('active', '?'),        # whether the event marks its day and project as active
+    ('additions', 'i8'),
+    ('deletions', 'i8'),
+    ('type', 'i2'),         # index into CommitEvents.types, -1 if unclassified
+])
+
+# Side tables: (event row, interned key, weight)
+_LINK_DTYPE = np.dtype([('event', 'i8'), ('key', 'i4'), ('weight', 'f8')])
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def to_epoch(when) -> int:
+    """UTC epoch seconds of an aware datetime or an ISO 8601 string."""
+    if isinstance(when, str):
+        when = datetime.fromisoformat(when.replace('Z', '+00:00'))
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return int(when.timestamp())
+
+
+def utc_offsets(times, tz=None):
+    """
+    UTC offsets in seconds for an array of epoch seconds, in `tz` (a tzinfo
+    or an IANA name; None is the system's local time). Offsets are looked
+    up once per distinct UTC day; only days containing a transition are
+    resolved per quarter hour, the finest step time zones use.
+    """
+    if isinstance(tz, str):
+        tz = ZoneInfo(tz)
+
+    def offset(seconds):
+        moment = datetime.fromtimestamp(int(seconds), tz=timezone.utc)
+        return (moment.astimezone(tz) if tz else moment.astimezone()).utcoffset().total_seconds()
+
+    days, inverse = np.unique(times // 86400, return_inverse=True)
+    at = {day: offset(day * 86400) for day in np.union1d(days, days + 1).tolist()}
+    offsets = np.array([at[day] for day in days.tolist()], dtype=np.int64)[inverse.reshape(-1)]
+
+    changing = [day for day in days.tolist() if at[day] != at[day + 1]]
+    if changing:
+        rows = np.flatnonzero(np.isin(times // 86400, changing))
+        slots, inverse = np.unique(times[rows] // 900, return_inverse=True)
+        offsets[rows] = np.array([offset(slot * 900) for slot in slots.tolist()], dtype=np.int64)[inverse.reshape(-1)]
+    return offsets
+
+
+class _Interner:
+    def __init__(self):
+        self.keys = []
+        self.ids = {}
+
+    def __call__(self, key):
+        index = self.ids.get(key)
+        if index is None:
+            index = self.ids[key] = len(self.keys)
+            self.keys.append(key)
+        return index
+
+
+class CommitEvents:
+    """
+    Columnar store of normalized commit events.
+    Providers append one event per commit (UTC time, project, commit count,
+    line counts, commit type) plus per-event extension and language weights,
+    and optional per-project language ratios, used for the commits that have
+    no language weights of their own. Nothing is bucketed at fetch
+    time: aggregate() builds a YearStats with vectorised group-bys for any
+    time zone, project subset or date range, so re-slicing never re-fetches.
+    Rows are buffered as tuples and turned into a structured NumPy array
+    (one column per field) on first read.
+    """
+
+    def __init__(self):
+        self._projects = _Interner()
+        self._types = _Interner()
+        self._extensions = _Interner()
+        self._languages = _Interner()
+        self.project_languages = {}     # project id -> {language: ratio}
+        self._rows, self._ext_rows, self._lang_rows = [], [], []
+        self._events = np.zeros(0, dtype=EVENT_DTYPE)
+        self._ext = np.zeros(0, dtype=_LINK_DTYPE)
+        self._lang = np.zeros(0, dtype=_LINK_DTYPE)
+
+    def __len__(self):
+        return self._events.size + len(self._rows)
+
+    @property
+    def projects(self):
+        return self._projects.keys
+
+    # --- Accumulation ---
+
+    def add(self, when, project, commits: int = 1, weight: int = None, active: bool = True,
+            additions: int = 0, deletions: int = 0, commit_type: str = None,
+            extensions=None, languages=None) -> int:
+        """
+        Appends one event and returns its row. `when` is an aware datetime,
+        an ISO string or epoch seconds; `extensions` and `languages` map
+        names to weights for this event.
+        """
+        row = len(self)
+        self._rows.append((
+            int(when) if isinstance(when, (int, np.integer)) else to_epoch(when),
+            self._projects(project), commits, commits if weight is None else weight, active,
+            additions, deletions, -1 if commit_type is None else self._types(commit_type),
+        ))
+        for ext, w in (extensions or {}).items():
+            self._ext_rows.append((row, self._extensions(ext), w))
+        for language, w in (languages or {}).items():
+            self._lang_rows.append((row, self._languages(language), w))
+        return row
+
+    def add_lines(self, row: int, additions: int, deletions: int):
+        events = self.events
+        events['additions'][row] += additions
+        events['deletions'][row] += deletions
+
+    def set_project_languages(self, project, breakdown: dict):
+        """Language ratios applied at query time to the commits of `project` without languages of their own."""
+        self.project_languages[self._projects(project)] = {self._languages(k): v for k, v in breakdown.items()}
+
+    @property
+    def events(self):
+        if self._rows:
+            self._events = np.concatenate([self._events, np.array(self._rows, dtype=EVENT_DTYPE)])
+            self._rows = []
+        return self._events
+
+    def _links(self):
+        if self._ext_rows:
+            self._ext = np.concatenate([self._ext, np.array(self._ext_rows, dtype=_LINK_DTYPE)])
+            self._ext_rows = []
+        if self._lang_rows:
+            self._lang = np.concatenate([self._lang, np.array(self._lang_rows, dtype=_LINK_DTYPE)])
+            self._lang_rows = []
+        return self._ext, self._lang
+
+    @classmethod
+    def concat(cls, stores):
+        """Merges several stores into a new one, re-interning keys."""
+        merged = cls()
+        for store in stores:
+            events = store.events.copy()
+            ext, lang = store._links()
+            offset = len(merged)
+            project_map = np.array([merged._projects(p) for p in store._projects.keys] or [0], dtype=np.int32)
+            type_map = np.array([merged._types(t) for t in store._types.keys] + [-1], dtype=np.int16)
+            ext_map = np.array([merged._extensions(e) for e in store._extensions.keys] or [0], dtype=np.int32)
+            lang_map = np.array([merged._languages(l) for l in store._languages.keys] or [0], dtype=np.int32)
+
+            events['project'] = project_map[events['project']]
+            events['type'] = type_map[events['type']]
+            ext, lang = ext.copy(), lang.copy()
+            ext['event'] += offset
+            ext['key'] = ext_map[ext['key']]
+            lang['event'] += offset
+            lang['key'] = lang_map[lang['key']]
+
+            merged._events = np.concatenate([merged.events, events])
+            merged._ext = np.concatenate([merged._links()[0], ext])
+            merged._lang = np.concatenate([merged._links()[1], lang])
+            for project, breakdown in store.project_languages.items():
+                merged.project_languages[int(project_map[project])] = {
+                    int(lang_map[k]): v for k, v in breakdown.items()}
+        return merged
+
+    # --- Queries ---
+
+    def select(self, projects=None, start: date = None, end: date = None, tz=None, days=None):
+        """Boolean row mask for a project subset and a local date range (inclusive)."""
+        events = self.events
+        mask = np.ones(events.size, dtype=bool)
+        if projects is not None:
+            ids = [self._projects.ids[p] for p in projects if p in self._projects.ids]
+            mask &= np.isin(events['project'], ids)
+        if start is not None or end is not None:
+            if days is None:
+                days = self.local_days(tz)
+            if start is not None:
+                mask &= days >= start.toordinal() - _EPOCH_ORDINAL
+            if end is not None:
+                mask &= days <= end.toordinal() - _EPOCH_ORDINAL
+        return mask
+
+    def local_seconds(self, tz=None):
+        times = self.events['time']
+        return times + utc_offsets(times, tz) if times.size else times
+
+    def local_days(self, tz=None):
+        return self.local_seconds(tz) // 86400
+
+    def aggregate(self, year: int, tz=None, projects=None, start: date = None, end: date = None) -> YearStats:
+        """Builds the YearStats of the selected events, bucketed in local time `tz`."""
+        events = self.events
+        ext, lang = self._links()
+        local = self.local_seconds(tz)
+        mask = self.select(projects, start, end, days=local // 86400)
+        rows = np.flatnonzero(mask)
+        e = events[rows]
+        local = local[rows]
+        stats = YearStats(year)
+
+        days = local // 86400
+        hours = (local % 86400) // 3600
+        weekdays = (days + 3) % 7                                   # 1970-01-01 was a Thursday
+        months = days.astype('datetime64[D]').astype('datetime64[M]').astype(np.int64) % 12 + 1
+        thursdays = days - weekdays + 3                             # ISO weeks belong to their Thursday's year
+        iso_start = thursdays.astype('datetime64[D]').astype('datetime64[Y]').astype('datetime64[D]')
+        weeks = (thursdays - iso_start.astype(np.int64)) // 7 + 1
+
+        weight = e['weight']
+        stats.total_commits = int(e['commits'].sum())
+        stats.lines_added = int(e['additions'].sum())
+        stats.lines_deleted = int(e['deletions'].sum())
+        stats.projects_count = int(np.unique(e['project']).size)
+        stats.months = np.bincount(months, weights=weight, minlength=13).astype(np.int64)
+        stats.hours = np.bincount(hours, weights=weight, minlength=24).astype(np.int64)
+        stats.weeks = np.bincount(weeks, weights=weight, minlength=54).astype(np.int64)
+        stats.punch_card = np.bincount(weekdays * 24 + hours, weights=weight,
+                                       minlength=7 * 24).astype(np.int64).reshape(7, 24)
+
+        # Day slots: only events inside the slot range count per day
+        slots = days + _EPOCH_ORDINAL - stats._origin
+        in_range = (slots >= 0) & (slots < YearStats.DAY_SLOTS)
+        stats.days = np.bincount(slots[in_range], weights=weight[in_range],
+                                 minlength=YearStats.DAY_SLOTS).astype(np.int64)
+        active = in_range & e['active']
+        stats.active[slots[active]] = True
+        active_projects = e['project'][active]
+        for project in dict.fromkeys(active_projects.tolist()):
+            stats.project_index(self._projects.keys[project])
+        if active_projects.size:
+            lookup = np.full(len(self._projects.keys), -1, dtype=np.int64)
+            for key, column in stats.project_ids.items():
+                lookup[self._projects.ids[key]] = column
+            columns = lookup[active_projects]
+            stats.project_days[slots[active], columns] = True
+
+        # Commit types, including types whose events carry no commits
+        typed = e['type'] >= 0
+        for type_id, count in zip(*_group_sum(e['type'][typed], e['commits'][typed])):
+            stats.commit_types[self._types.keys[type_id]] = int(count)
+
+        # Extensions and per-event languages
+        linked = mask[ext['event']]
+        for key, value in zip(*_group_sum(ext['key'][linked], ext['weight'][linked])):
+            stats.extensions[self._extensions.keys[key]] = _number(value)
+        linked = mask[lang['event']]
+        for key, value in zip(*_group_sum(lang['key'][linked], lang['weight'][linked])):
+            stats.add_language(self._languages.keys[key], value)
+
+        # Per-project language ratios, weighted by the project's commits that
+        # carry no languages of their own (e.g. no file list was available)
+        if self.project_languages:
+            counted = e['active'].copy()
+            counted[np.isin(rows, lang['event'])] = False
+            for project, commits in zip(*_group_sum(e['project'][counted], e['commits'][counted])):
+                for language, ratio in self.project_languages.get(int(project), {}).items():
+                    stats.add_language(self._languages.keys[language], int(commits) * ratio)
+        return stats
+
+
+def _group_sum(keys, values):
+    """(distinct keys in order of first appearance, summed values)."""
+    if not keys.size:
+        return [], []
+    unique, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+    sums = np.bincount(inverse.reshape(-1), weights=values, minlength=unique.size)
+    order = np.argsort(first, kind='stable')
+    return unique[order].tolist(), sums[order].tolist()
+
+
+def _number(value):
+    return int(value) if float(value).is_integer() else value
@@ -0,0 +1,63 @@
+import os
+
+# Precomputed file extension -> language table (lower-case extensions)
+EXTENSION_LANGUAGES = {
+    '.py': 'Python', '.pyi': 'Python', '.pyx': 'Cython', '.ipynb': 'Jupyter Notebook',
+    '.js': 'JavaScript', '.mjs': 'JavaScript', '.cjs': 'JavaScript', '.jsx': 'JavaScript',
+    '.ts': 'TypeScript', '.tsx': 'TypeScript', '.vue': 'Vue', '.svelte': 'Svelte',
+    '.html': 'HTML', '.htm': 'HTML', '.css': 'CSS', '.scss': 'SCSS', '.sass': 'Sass', '.less': 'Less',
+    '.java': 'Java', '.kt': 'Kotlin', '.kts': 'Kotlin', '.scala': 'Scala', '.groovy': 'Groovy', '.gradle': 'Groovy',
+    '.c': 'C', '.h': 'C', '.cc': 'C++', '.cpp': 'C++', '.cxx': 'C++', '.hpp': 'C++', '.hh': 'C++',
+    '.cs': 'C#', '.fs': 'F#', '.vb': 'Visual Basic .NET',
+    '.go': 'Go', '.rs': 'Rust', '.swift': 'Swift', '.m': 'Objective-C', '.mm': 'Objective-C++',
+    '.rb': 'Ruby', '.php': 'PHP', '.pl': 'Perl', '.pm': 'Perl', '.lua': 'Lua', '.r': 'R',
+    '.dart': 'Dart', '.ex': 'Elixir', '.exs': 'Elixir', '.erl': 'Erlang', '.hs': 'Haskell',
+    '.clj': 'Clojure', '.ml': 'OCaml', '.jl': 'Julia', '.zig': 'Zig', '.nim': 'Nim',
+    '.sh': 'Shell', '.bash': 'Shell', '.zsh': 'Shell', '.ps1': 'PowerShell', '.bat': 'Batchfile',
+    '.sql': 'SQL', '.graphql': 'GraphQL', '.proto': 'Protocol Buffer',
+    '.tf': 'HCL', '.hcl': 'HCL', '.nix': 'Nix', '.dockerfile': 'Dockerfile',
+    '.cmake': 'CMake', '.mk': 'Makefile',
+    '.md': 'Markdown', '.rst': 'reStructuredText', '.tex': 'TeX',
+    '.yml': 'YAML', '.yaml': 'YAML', '.json': 'JSON', '.toml': 'TOML', '.xml': 'XML',
+}
+
+# Well-known file names without a meaningful extension
+FILENAME_LANGUAGES = {
+    'dockerfile': 'Dockerfile', 'makefile': 'Makefile', 'cmakelists.txt': 'CMake',
+    'gemfile': 'Ruby', 'rakefile': 'Ruby', 'jenkinsfile': 'Groovy',
+}
+
+
+def file_extension(filename: str) -> str:
+    """Lower-case extension of a path, or '' when it has none (or an implausible one)."""
+    ext = os.path.splitext(filename)[1].lower()
+    return ext if len(ext) < 10 else ''
+
+
+def language_for(filename: str):
+    """Language of a file path from the tables above, or None when unknown."""
+    base = os.path.basename(filename).lower()
+    return FILENAME_LANGUAGES.get(base) or EXTENSION_LANGUAGES.get(file_extension(base))
+
+
+def summarize_files(files):
+    """
+    Extension and language weights of a commit's changed files, given as
+    (filename, added, deleted). Extensions are weighted by lines changed;
+    the commit's unit weight is split across its languages in the same
+    proportions. Files without line counts (binary, or a plain filename
+    from older records) weigh 1.
+    """
+    extensions, languages = {}, {}
+    for entry in files:
+        filename, added, deleted = (entry, 0, 0) if isinstance(entry, str) else entry
+        weight = added + deleted or 1
+        ext = file_extension(filename)
+        if ext:
+            extensions[ext] = extensions.get(ext, 0) + weight
+        language = language_for(filename)
+        if language:
+            languages[language] = languages.get(language, 0) + weight
+
+    total = sum(languages.values())
+    return extensions, {language: weight / total for language, weight in languages.items()}
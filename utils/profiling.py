@@ -0,0 +1,177 @@
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from urllib.parse import urlsplit
+
+# Path segments that identify a resource rather than an endpoint
+_ENDPOINT_PATTERNS = [
+    (re.compile(r'/repos/[^/]+/[^/]+'), '/repos/:owner/:repo'),
+    (re.compile(r'/users/[^/]+'), '/users/:user'),
+    (re.compile(r'/projects/[^/]+'), '/projects/:id'),
+    (re.compile(r'/[0-9a-f]{40}(?=/|$)'), '/:sha'),
+    (re.compile(r'/\d+(?=/|$)'), '/:id'),
+]
+
+
+def endpoint_name(method, url):
+    """'GET api.github.com /repos/:owner/:repo/commits/:sha' for a request URL."""
+    parts = urlsplit(url)
+    path = parts.path
+    for pattern, replacement in _ENDPOINT_PATTERNS:
+        path = pattern.sub(replacement, path)
+    return f"{method} {parts.netloc}{path}"
+
+
+class Profiler:
+    """
+    Span timers and counters for a run.
+    Disabled by default: span() then returns a shared no-op context and
+    count() returns immediately, so instrumented hot paths cost next to
+    nothing. Spans are kept individually (name, category, start, duration,
+    thread) so they can be exported as a Chrome trace.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.spans = []
+        self.counters = {}
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+        self._null = nullcontext()
+        self._instrumented = False
+
+    def enable(self):
+        self.enabled = True
+        self._origin = time.perf_counter()
+        self._instrument_requests()
+
+    def span(self, name, category='app'):
+        if not self.enabled:
+            return self._null
+        return self._span(name, category)
+
+    @contextmanager
+    def _span(self, name, category):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, start, time.perf_counter() - start, category)
+
+    def record(self, name, start, duration, category='app'):
+        """Adds a span measured elsewhere (start is a time.perf_counter() value)."""
+        if self.enabled:
+            with self._lock:
+                self.spans.append((name, category, start - self._origin, duration, threading.get_ident()))
+
+    def count(self, name, n=1):
+        if self.enabled and n:
+            with self._lock:
+                self.counters[name] = self.counters.get(name, 0) + n
+
+    def _instrument_requests(self):
+        # PyGithub and python-gitlab both send through requests.Session: one
+        # wrapper times every HTTP call of either client, per endpoint.
+        try:
+            import requests
+        except ImportError:
+            return
+        if self._instrumented:
+            return
+        self._instrumented = True
+        send = requests.Session.send
+
+        def profiled_send(session, request, **kwargs):
+            with self.span(endpoint_name(request.method, request.url), 'http'):
+                return send(session, request, **kwargs)
+
+        requests.Session.send = profiled_send
+
+    def summary(self):
+        """Per-span totals, counters and cache hit ratios."""
+        with self._lock:
+            spans = list(self.spans)
+            counters = dict(self.counters)
+
+        totals = {}
+        for name, category, _, duration, _ in spans:
+            entry = totals.setdefault(name, {'name': name, 'category': category, 'calls': 0,
+                                             'total_s': 0.0, 'max_s': 0.0})
+            entry['calls'] += 1
+            entry['total_s'] += duration
+            entry['max_s'] = max(entry['max_s'], duration)
+
+        caches = {}
+        for name, value in counters.items():
+            prefix, _, kind = name.rpartition('.')
+            if kind in ('hit', 'miss'):
+                caches.setdefault(prefix, {'hit': 0, 'miss': 0})[kind] = value
+        for entry in caches.values():
+            lookups = entry['hit'] + entry['miss']
+            entry['ratio'] = entry['hit'] / lookups if lookups else None
+
+        return {
+            'wall_s': time.perf_counter() - self._origin,
+            'spans': sorted(totals.values(), key=lambda e: (e['category'], -e['total_s'])),
+            'http_requests': sum(e['calls'] for e in totals.values() if e['category'] == 'http'),
+            'counters': counters,
+            'caches': caches,
+        }
+
+    def chrome_trace(self):
+        """The spans as Chrome trace events (load in chrome://tracing or Perfetto)."""
+        with self._lock:
+            spans = list(self.spans)
+            counters = dict(self.counters)
+        pid = os.getpid()
+        threads = {}
+        events = []
+        for name, category, start, duration, thread in spans:
+            tid = threads.setdefault(thread, len(threads) + 1)
+            events.append({'name': name, 'cat': category, 'ph': 'X', 'pid': pid, 'tid': tid,
+                           'ts': round(start * 1e6, 1), 'dur': round(duration * 1e6, 1)})
+        return {'traceEvents': events, 'displayTimeUnit': 'ms', 'otherData': {'counters': counters}}
+
+    def export(self, path, fmt='json'):
+        data = self.chrome_trace() if fmt == 'chrome' else self.summary()
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=None if fmt == 'chrome' else 2)
+
+    def print_summary(self, console):
+        from rich.table import Table
+        from rich import box
+
+        summary = self.summary()
+        table = Table(box=box.SIMPLE_HEAVY, show_header=True, title="Profile")
+        table.add_column("Span")
+        table.add_column("Kind")
+        table.add_column("Calls", justify="right")
+        table.add_column("Total", justify="right")
+        table.add_column("Mean", justify="right")
+        table.add_column("Max", justify="right")
+        for e in summary['spans']:
+            table.add_row(e['name'], e['category'], str(e['calls']), f"{e['total_s']:.2f}s",
+                          f"{e['total_s'] / e['calls'] * 1000:.1f}ms", f"{e['max_s'] * 1000:.1f}ms")
+        console.print(table)
+
+        if summary['caches']:
+            caches = Table(box=box.SIMPLE_HEAVY, show_header=True, title="Caches")
+            caches.add_column("Cache")
+            caches.add_column("Hits", justify="right")
+            caches.add_column("Misses", justify="right")
+            caches.add_column("Hit Ratio", justify="right")
+            for name, e in sorted(summary['caches'].items()):
+                ratio = f"{e['ratio']:.0%}" if e['ratio'] is not None else "-"
+                caches.add_row(name, str(e['hit']), str(e['miss']), ratio)
+            console.print(caches)
+
+        waits = sum(e['total_s'] for e in summary['spans'] if e['category'] == 'wait')
+        console.print(f"{summary['http_requests']} HTTP requests, {waits:.1f}s rate-limit wait, "
+                      f"{summary['wall_s']:.1f}s total")
+
+
+# Shared by every module of the process
+profiler = Profiler()
@@ -0,0 +1,187 @@
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+from .profiling import profiler
+
+HIGH, LOW = 0, 1
+
+# (requests, seconds) assumed for a resource until its first response says otherwise
+DEFAULT_LIMITS = {
+    'core': (5000, 3600),     # GitHub REST
+    'search': (30, 60),       # GitHub search
+    'graphql': (5000, 3600),  # GitHub GraphQL
+    'api': (2000, 60),        # GitLab REST (gitlab.com, authenticated)
+}
+
+# Listing calls are few and carry the data itself; everything else enriches it
+_HIGH_PRIORITY = ('/search/', '/graphql', '/events', '/user')
+
+
+def classify(url):
+    """Returns ((host, resource), priority) for a request URL."""
+    parts = urlsplit(url)
+    path = parts.path
+    if '/api/v4/' in path:
+        resource = 'api'
+    elif path.startswith('/search/') or '/api/v3/search/' in path:
+        resource = 'search'
+    elif path.endswith('/graphql'):
+        resource = 'graphql'
+    else:
+        resource = 'core'
+    high = any(marker in path for marker in _HIGH_PRIORITY) and '/repos/' not in path
+    return (parts.netloc, resource), HIGH if high else LOW
+
+
+class TokenBucket:
+    """
+    Request budget of one API resource.
+    Tokens refill at limit/window per second and are re-synchronised with the
+    server's remaining-quota headers after every response. A share of the
+    limit (`reserve`) is kept for high priority requests: low priority ones
+    wait instead of spending it.
+    """
+
+    def __init__(self, limit, window, reserve=0.1):
+        self.limit = limit
+        self.window = window
+        self.reserve_ratio = reserve
+        self.tokens = float(limit)
+        self.blocked_until = 0.0
+        self.high_waiting = 0
+        self._updated = time.monotonic()
+        self._cond = threading.Condition()
+
+    @property
+    def rate(self):
+        return self.limit / self.window
+
+    @property
+    def reserve(self):
+        return self.limit * self.reserve_ratio
+
+    def _refill(self, now):
+        self.tokens = min(self.limit, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, priority=HIGH):
+        """Blocks until a request may be sent; returns the seconds waited."""
+        started = time.monotonic()
+        with self._cond:
+            if priority == HIGH:
+                self.high_waiting += 1
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    needed = 1 + (self.reserve if priority == LOW else 0)
+                    if self.blocked_until > now:
+                        delay = self.blocked_until - now
+                    elif priority == LOW and self.high_waiting:
+                        delay = None
+                    elif self.tokens >= needed:
+                        self.tokens -= 1
+                        return now - started
+                    else:
+                        delay = (needed - self.tokens) / self.rate
+                    self._cond.wait(delay)
+            finally:
+                if priority == HIGH:
+                    self.high_waiting -= 1
+                    self._cond.notify_all()
+
+    def has_budget(self):
+        """False once only the high priority reserve is left: optional requests should be skipped."""
+        with self._cond:
+            self._refill(time.monotonic())
+            return self.blocked_until <= time.monotonic() and self.tokens >= 1 + self.reserve
+
+    def observe(self, limit=None, remaining=None, reset=None, retry_after=None):
+        """Updates the budget from a response's rate-limit headers (reset is an epoch time)."""
+        with self._cond:
+            now = time.monotonic()
+            self._refill(now)
+            if limit:
+                self.limit = limit
+            if remaining is not None:
+                self.tokens = min(self.tokens, remaining)
+                if remaining == 0 and reset:
+                    self.blocked_until = max(self.blocked_until, now + max(reset - time.time(), 0) + 1)
+            if retry_after:
+                self.blocked_until = max(self.blocked_until, now + retry_after)
+            self._cond.notify_all()
+
+
+def _header(headers, *names):
+    for name in names:
+        value = headers.get(name)
+        if value is not None:
+            try:
+                return int(float(value))
+            except ValueError:
+                pass
+    return None
+
+
+class RateLimitScheduler:
+    """
+    One token bucket per (host, resource), shared by every provider of the process.
+    Once install()ed, every request sent by PyGithub or python-gitlab waits
+    for its bucket; clients built on other transports call acquire() and
+    observe() themselves.
+    """
+
+    def __init__(self, reserve=None):
+        self.reserve = float(os.getenv('RATE_LIMIT_RESERVE', 0.1)) if reserve is None else reserve
+        self.buckets = {}
+        self._lock = threading.Lock()
+        self._installed = False
+
+    def bucket(self, key):
+        with self._lock:
+            if key not in self.buckets:
+                limit, window = DEFAULT_LIMITS[key[1]]
+                self.buckets[key] = TokenBucket(limit, window, self.reserve)
+            return self.buckets[key]
+
+    def acquire(self, url, priority=None):
+        key, default_priority = classify(url)
+        waited = self.bucket(key).acquire(default_priority if priority is None else priority)
+        if waited > 0.001:
+            profiler.record(f"ratelimit.{key[1]}_wait", time.perf_counter() - waited, waited, 'wait')
+
+    def observe(self, url, status, headers):
+        key, _ = classify(url)
+        retry_after = _header(headers, 'Retry-After') if status in (403, 429) else None
+        self.bucket(key).observe(
+            limit=_header(headers, 'X-RateLimit-Limit', 'RateLimit-Limit'),
+            remaining=_header(headers, 'X-RateLimit-Remaining', 'RateLimit-Remaining'),
+            reset=_header(headers, 'X-RateLimit-Reset', 'RateLimit-Reset'),
+            retry_after=retry_after)
+
+    def has_budget(self, url):
+        """Whether optional enrichment requests to `url` should still be sent."""
+        key, _ = classify(url)
+        return self.bucket(key).has_budget()
+
+    def install(self):
+        # PyGithub and python-gitlab both send through requests.Session
+        import requests
+        with self._lock:
+            if self._installed:
+                return
+            self._installed = True
+        send = requests.Session.send
+
+        def scheduled_send(session, request, **kwargs):
+            self.acquire(request.url)
+            response = send(session, request, **kwargs)
+            self.observe(request.url, response.status_code, response.headers)
+            return response
+
+        requests.Session.send = scheduled_send
+
+
+# Shared by every provider of the process
+scheduler = RateLimitScheduler()
@@ -0,0 +1,310 @@
+import json
+from datetime import date
+
+import numpy as np
+
+
+def _bump(counter, key, value):
+    counter[key] = counter.get(key, 0) + value
+
+
+def _run_lengths(mask):
+    """Lengths of the runs of True values in a 1-D boolean array."""
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], mask.astype(np.int8), [0]))))
+    return edges[1::2] - edges[::2]
+
+
+class YearStats:
+    """
+    Array-backed accumulator for one year of activity.
+    Time buckets are fixed-size NumPy arrays indexed directly by month, hour,
+    ISO week, (weekday, hour) and day of year, so increments are O(1) and
+    merging N providers is a single vectorised sum. Active days and the
+    projects touched each day are day-of-year bitmaps (projects are interned
+    to small ints), so streaks and daily records are run-length/argmax
+    operations instead of date string parsing. The dict structure
+    described in GitProvider.get_year_stats is exposed through
+    stats['field'] / stats.get() / to_dict(), and save()/load() read and
+    write versioned .npz snapshots.
+    """
+
+    __slots__ = ('year', 'total_commits', 'projects_count', 'lines_added', 'lines_deleted',
+                 'months', 'hours', 'weeks', 'punch_card', 'days', 'active', 'project_ids', 'project_days',
+                 'languages', 'extensions', 'commit_types', '_origin')
+
+    # Day slots run from Dec 31 of the previous year (slot 0) to Jan 2 or 3
+    # of the next, since converting UTC timestamps to local time can spill
+    # into the neighbouring years. The daily records only read the year's
+    # own slots (see _year_days).
+    DAY_SLOTS = 369
+
+    SNAPSHOT_FORMAT = 'devwrapped-stats'
+    SNAPSHOT_VERSION = 1
+    _SNAPSHOT_ARRAYS = ('months', 'hours', 'weeks', 'punch_card', 'days', 'active')
+
+    def __init__(self, year: int):
+        self.year = year
+        self.total_commits = 0
+        self.projects_count = 0
+        self.lines_added = 0
+        self.lines_deleted = 0
+        self.months = np.zeros(13, dtype=np.int64)      # index 1..12
+        self.hours = np.zeros(24, dtype=np.int64)
+        self.weeks = np.zeros(54, dtype=np.int64)       # ISO weeks 1..53
+        self.punch_card = np.zeros((7, 24), dtype=np.int64)
+        self.days = np.zeros(self.DAY_SLOTS, dtype=np.int64)
+        self.active = np.zeros(self.DAY_SLOTS, dtype=bool)
+        self.project_ids = {}                           # project key -> column
+        self.project_days = np.zeros((self.DAY_SLOTS, 8), dtype=bool)
+        self.languages = {}
+        self.extensions = {}
+        self.commit_types = {}
+        self._origin = date(year, 1, 1).toordinal() - 1
+
+    # --- Accumulation ---
+
+    def day_index(self, day: date) -> int:
+        return day.toordinal() - self._origin
+
+    def day_from_index(self, index: int) -> date:
+        return date.fromordinal(int(index) + self._origin)
+
+    def project_index(self, project) -> int:
+        """Interns a project key to a column of project_days."""
+        index = self.project_ids.get(project)
+        if index is None:
+            index = self.project_ids[project] = len(self.project_ids)
+            if index >= self.project_days.shape[1]:
+                grown = np.zeros((self.DAY_SLOTS, 2 * self.project_days.shape[1]), dtype=bool)
+                grown[:, :index] = self.project_days
+                self.project_days = grown
+        return index
+
+    def add_language(self, language: str, weight: float):
+        _bump(self.languages, language, weight)
+
+    # --- Merging ---
+
+    @classmethod
+    def merge(cls, all_stats, year: int = None):
+        """Merges YearStats (or contract dicts) of any number of providers."""
+        all_stats = [s if isinstance(s, YearStats) else cls.from_dict(s, year) for s in all_stats]
+        merged = cls(year if year is not None else all_stats[0].year if all_stats else date.today().year)
+        if not all_stats:
+            return merged
+
+        merged.total_commits = sum(s.total_commits for s in all_stats)
+        merged.projects_count = sum(s.projects_count for s in all_stats)
+        merged.lines_added = sum(s.lines_added for s in all_stats)
+        merged.lines_deleted = sum(s.lines_deleted for s in all_stats)
+
+        for field in ('months', 'hours', 'weeks', 'punch_card', 'days'):
+            setattr(merged, field, np.sum([getattr(s, field) for s in all_stats], axis=0))
+        merged.active = np.any([s.active for s in all_stats], axis=0)
+
+        for s in all_stats:
+            for field in ('languages', 'extensions', 'commit_types'):
+                target = getattr(merged, field)
+                for k, v in getattr(s, field).items():
+                    _bump(target, k, v)
+
+            # Union of the daily project bitmaps, remapping interned ids
+            columns = [merged.project_index(p) for p in s.project_ids]
+            merged.project_days[:, columns] |= s.project_days[:, :len(columns)]
+
+        return merged
+
+    @classmethod
+    def from_dict(cls, data: dict, year: int = None):
+        """Builds a YearStats from the plain dict contract."""
+        if year is None:
+            first = min(data.get('dates') or data.get('daily_commits') or [f"{date.today().year}-01-01"])
+            year = int(first[:4])
+        stats = cls(year)
+        stats.total_commits = data.get('total_commits', 0)
+        stats.projects_count = data.get('projects_count', 0)
+        stats.lines_added = data.get('lines_added', 0)
+        stats.lines_deleted = data.get('lines_deleted', 0)
+        for k, v in data.get('commits_by_month', {}).items():
+            stats.months[k] += v
+        for k, v in data.get('commits_by_hour', {}).items():
+            stats.hours[k] += v
+        for k, v in data.get('weekly_activity', {}).items():
+            stats.weeks[k] += v
+        for (weekday, hour), v in data.get('punch_card', {}).items():
+            stats.punch_card[weekday, hour] += v
+        for date_str, v in data.get('daily_commits', {}).items():
+            day = stats.day_index(date.fromisoformat(date_str))
+            if 0 <= day < cls.DAY_SLOTS:
+                stats.days[day] += v
+        for date_str in data.get('dates', set()):
+            day = stats.day_index(date.fromisoformat(date_str))
+            if 0 <= day < cls.DAY_SLOTS:
+                stats.active[day] = True
+        for date_str, projs in data.get('daily_projects', {}).items():
+            day = stats.day_index(date.fromisoformat(date_str))
+            if 0 <= day < cls.DAY_SLOTS:
+                for project in projs:
+                    column = stats.project_index(project)
+                    stats.project_days[day, column] = True
+        stats.languages = dict(data.get('languages', {}))
+        stats.extensions = dict(data.get('extensions', {}))
+        stats.commit_types = dict(data.get('commit_types', {}))
+        return stats
+
+    # --- Snapshots ---
+
+    def save(self, file, **meta):
+        """
+        Writes a snapshot: a compressed .npz with one array per time bucket,
+        the project bitmap bit-packed, and a JSON header holding the format
+        version, scalars, project keys, counters and `meta` (e.g. user name).
+        No pickle is involved, so snapshots load safely anywhere.
+        """
+        projects = list(self.project_ids)
+        header = {
+            'format': self.SNAPSHOT_FORMAT,
+            'version': self.SNAPSHOT_VERSION,
+            'year': self.year,
+            'total_commits': int(self.total_commits),
+            'projects_count': int(self.projects_count),
+            'lines_added': int(self.lines_added),
+            'lines_deleted': int(self.lines_deleted),
+            'projects': projects,
+            'languages': self.languages,
+            'extensions': self.extensions,
+            'commit_types': self.commit_types,
+            'meta': meta,
+        }
+        np.savez_compressed(
+            file,
+            header=np.frombuffer(json.dumps(header).encode(), dtype=np.uint8),
+            project_days=np.packbits(self.project_days[:, :len(projects)], axis=1),
+            **{field: getattr(self, field) for field in self._SNAPSHOT_ARRAYS})
+
+    @staticmethod
+    def _read_header(data):
+        header = json.loads(data['header'].tobytes())
+        if header.get('format') != YearStats.SNAPSHOT_FORMAT:
+            raise ValueError("Not a DevWrapped stats snapshot")
+        if header.get('version') != YearStats.SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported snapshot version: {header.get('version')}")
+        return header
+
+    @classmethod
+    def load(cls, file):
+        """Reads a snapshot written by save()."""
+        with np.load(file, allow_pickle=False) as data:
+            header = cls._read_header(data)
+            stats = cls(header['year'])
+            stats.total_commits = header['total_commits']
+            stats.projects_count = header['projects_count']
+            stats.lines_added = header['lines_added']
+            stats.lines_deleted = header['lines_deleted']
+            stats.languages = header['languages']
+            stats.extensions = header['extensions']
+            stats.commit_types = header['commit_types']
+            for field in cls._SNAPSHOT_ARRAYS:
+                setattr(stats, field, data[field])
+
+            projects = header['projects']
+            for project in projects:
+                stats.project_index(project)
+            stats.project_days[:, :len(projects)] = np.unpackbits(
+                data['project_days'], axis=1, count=len(projects)).astype(bool)
+        return stats
+
+    @classmethod
+    def snapshot_info(cls, file) -> dict:
+        """The year and `meta` of a snapshot, without loading its arrays."""
+        with np.load(file, allow_pickle=False) as data:
+            header = cls._read_header(data)
+        return dict(header['meta'], year=header['year'])
+
+    # --- Daily records ---
+    # Computed on the year's own days: the spill-over slots are left out
+
+    def _year_days(self):
+        """Slice of the day slots from Jan 1 to Dec 31 of the year."""
+        return slice(1, date(self.year + 1, 1, 1).toordinal() - self._origin)
+
+    def projects_per_day(self):
+        """Distinct projects per day of the year (index 0 is Jan 1)."""
+        return self.project_days[self._year_days()].sum(axis=1)
+
+    def longest_streak(self) -> int:
+        """Longest run of consecutive active days."""
+        runs = _run_lengths(self.active[self._year_days()])
+        return int(runs.max()) if runs.size else 0
+
+    def longest_gap(self) -> int:
+        """Longest run of inactive days between the first and the last active day."""
+        active = self.active[self._year_days()]
+        active_days = np.flatnonzero(active)
+        if active_days.size < 2:
+            return 0
+        runs = _run_lengths(~active[active_days[0]:active_days[-1] + 1])
+        return int(runs.max()) if runs.size else 0
+
+    def busiest_day(self):
+        """(date, commits) of the day with most commits, or (None, 0)."""
+        days = self.days[self._year_days()]
+        if not days.any():
+            return None, 0
+        day = int(np.argmax(days))
+        return self.day_from_index(day + 1), int(days[day])
+
+    def busiest_project_day(self):
+        """(date, projects) of the day with most distinct projects, or (None, 0)."""
+        per_day = self.projects_per_day()
+        if not per_day.any():
+            return None, 0
+        day = int(np.argmax(per_day))
+        return self.day_from_index(day + 1), int(per_day[day])
+
+    # --- Dict view ---
+
+    def _daily_commits(self):
+        return {self.day_from_index(i).isoformat(): int(self.days[i]) for i in np.flatnonzero(self.days)}
+
+    def _dates(self):
+        return {self.day_from_index(i).isoformat() for i in np.flatnonzero(self.active)}
+
+    def _daily_projects(self):
+        projects = list(self.project_ids)
+        return {self.day_from_index(day).isoformat(): {projects[p] for p in np.flatnonzero(row)}
+                for day, row in enumerate(self.project_days) if row.any()}
+
+    def _punch_card(self):
+        return {(int(d), int(h)): int(self.punch_card[d, h]) for d, h in zip(*np.nonzero(self.punch_card))}
+
+    _VIEWS = {
+        'total_commits': lambda s: s.total_commits,
+        'projects_count': lambda s: s.projects_count,
+        'lines_added': lambda s: s.lines_added,
+        'lines_deleted': lambda s: s.lines_deleted,
+        'commits_by_month': lambda s: {i: int(s.months[i]) for i in range(1, 13)},
+        'commits_by_hour': lambda s: {i: int(s.hours[i]) for i in range(24)},
+        'languages': lambda s: s.languages,
+        'dates': _dates,
+        'punch_card': _punch_card,
+        'extensions': lambda s: s.extensions,
+        'weekly_activity': lambda s: {i: int(s.weeks[i]) for i in range(1, 54)},
+        'commit_types': lambda s: s.commit_types,
+        'daily_projects': _daily_projects,
+        'daily_commits': _daily_commits,
+    }
+
+    def __getitem__(self, key):
+        if key not in self._VIEWS:
+            raise KeyError(key)
+        return self._VIEWS[key](self)
+
+    def get(self, key, default=None):
+        return self[key] if key in self._VIEWS else default
+
+    def keys(self):
+        return self._VIEWS.keys()
+
+    def to_dict(self) -> dict:
+        return {key: self[key] for key in self._VIEWS}
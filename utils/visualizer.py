@@ -1,16 +1,34 @@
-import matplotlib.pyplot as plt
-import seaborn as sns
+import time
+import numpy as np
 from rich.console import Console
 from rich.table import Table
 from rich.panel import Panel
 from rich import box
-from datetime import datetime
+from .profiling import profiler
 
 class Visualizer:
-    def __init__(self):
+    """
+    Terminal and poster reports.
+    The poster is drawn on an explicit Agg canvas. With renderer='template'
+    the figure, its layout and its static artists are built once and only
+    the data artists are updated between reports; renderer='classic'
+    rebuilds the figure for every image. Per-stage durations of the last
+    image are kept in self.timings.
+    matplotlib and seaborn are only imported when the first poster is drawn,
+    so terminal-only runs never load the plotting stack.
+    """
+
+    DPI = 150
+
+    def __init__(self, renderer: str = 'template'):
+        if renderer not in ('template', 'classic'):
+            raise ValueError(f"Unknown renderer: {renderer}")
         self.console = Console()
-        plt.style.use('dark_background')
-        self.colors_pie = sns.color_palette("pastel")
+        self.renderer = renderer
+        self.colors_pie = None
+        self.timings = {}
+        self._template = None
+        self._template_bbox = None
 
     def determine_persona(self, hourly_stats):
         morning = sum(hourly_stats.get(h, 0) for h in range(5, 12))
@@ -21,20 +39,6 @@ class Visualizer:
         if morning > total * 0.45: return "Early Bird ☕"
         return "9-to-5 Pro 👔"
 
-    def calculate_streak(self, date_set):
-        if not date_set: return 0
-        sorted_dates = sorted([datetime.strptime(d, "%Y-%m-%d") for d in date_set])
-        longest = 1
-        current = 1
-        for i in range(1, len(sorted_dates)):
-            delta = sorted_dates[i] - sorted_dates[i - 1]
-            if delta.days == 1:
-                current += 1
-            elif delta.days > 1:
-                longest = max(longest, current)
-                current = 1
-        return max(longest, current)
-
     def print_terminal_report(self, stats, user_name, year):
         self.console.print(Panel.fit(f"[bold magenta]DEV WRAPPED {year}[/bold magenta]\n[cyan]{user_name}[/cyan]"))
         table = Table(box=box.SIMPLE_HEAVY, show_header=True)
@@ -50,45 +54,70 @@ class Visualizer:
             table.add_row("Lines Deleted", f"-{deleted:,}", style="red")
 
         # Context Switcher Calculation
-        daily = stats.get('daily_projects', {})
-        active_days = len(daily)
-        switches = sum(len(p) for p in daily.values())
-        avg = (switches / active_days) if active_days else 0
+        per_day = stats.projects_per_day()
+        active_days = int((per_day > 0).sum())
+        avg = (per_day.sum() / active_days) if active_days else 0
         table.add_row("Avg Projects/Day", f"{avg:.2f}")
+        table.add_row("Longest Streak", f"{stats.longest_streak()} days")
+        table.add_row("Longest Break", f"{stats.longest_gap()} days")
 
         self.console.print(table)
 
-    def generate_shareable_image(self, stats, user_name, year):
-        # 1. Prepare Data
-        streak = self.calculate_streak(stats.get('dates', set()))
-
-        # Record Max Projects
-        d_projs = stats.get('daily_projects', {})
-        max_p = 0
-        date_p = "-"
-        if d_projs:
-            max_p = max(len(x) for x in d_projs.values())
-            date_iso = max(d_projs, key=lambda k: len(d_projs[k]))
-            try:
-                date_p = datetime.strptime(date_iso, "%Y-%m-%d").strftime("%d %b")
-            except:
-                pass
-
-        # Record Max Commits
-        d_comms = stats.get('daily_commits', {})
-        max_c = 0
-        date_c = "-"
-        if d_comms:
-            max_c = max(d_comms.values())
-            date_iso = max(d_comms, key=d_comms.get)
-            try:
-                date_c = datetime.strptime(date_iso, "%Y-%m-%d").strftime("%d %b")
-            except:
-                pass
-
-        # 2. Setup Figure (Standard 10x15 Poster format)
-        fig = plt.figure(figsize=(10, 15))
+    def _image_data(self, stats, user_name, year):
+        # Record Max Projects / Max Commits
+        day_p, max_p = stats.busiest_project_day()
+        date_p = day_p.strftime("%d %b") if day_p else "-"
+        day_c, max_c = stats.busiest_day()
+        date_c = day_c.strftime("%d %b") if day_c else "-"
+
+        # Punch card bubbles
+        days, hours = np.nonzero(stats.punch_card)
+        counts = stats.punch_card[days, hours]
+        sizes = counts / counts.max() * 300 + 20 if counts.size else counts
+
+        # Top 5 languages + Other
+        langs = stats.languages
+        s_langs = sorted(langs.items(), key=lambda x: x[1], reverse=True)[:5]
+        others = sum(langs.values()) - sum(v for k, v in s_langs)
+        labels = [k for k, v in s_langs]
+        values = [v for k, v in s_langs]
+        if others > 0:
+            labels.append("Other")
+            values.append(others)
+
+        return {
+            'title': f"DEV WRAPPED {year}",
+            'user': f"@{user_name}",
+            'stats': [
+                (stats.total_commits, None),
+                (stats.longest_streak(), None),
+                (max_p, f"on {date_p}"),
+                (max_c, f"on {date_c}"),
+            ],
+            'weekly': stats.weeks[1:53],
+            'punch': (days, hours, sizes),
+            'languages': (labels, values),
+        }
+
+    def _setup_plotting(self):
+        import matplotlib
+        import seaborn as sns
+        matplotlib.style.use('dark_background')
+        self.colors_pie = sns.color_palette("pastel")
+
+    def _build_figure(self):
+        """Creates the poster layout and returns its updatable artists."""
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        if self.colors_pie is None:
+            self._setup_plotting()
+
+        # Standard 10x15 Poster format, laid out at the dpi it is saved with
+        fig = Figure(figsize=(10, 15), dpi=self.DPI)
+        FigureCanvasAgg(fig)
         fig.patch.set_facecolor('#0f0f0f')
+        artists = {'fig': fig}
 
         # Grid Layout: 5 Rows
         gs = fig.add_gridspec(5, 1, height_ratios=[0.1, 0.15, 0.25, 0.25, 0.25], hspace=0.4)
@@ -96,31 +125,27 @@ class Visualizer:
         # --- ROW 0: HEADER ---
         ax_head = fig.add_subplot(gs[0])
         ax_head.axis('off')
-        ax_head.text(0.5, 0.7, f"DEV WRAPPED {year}", ha='center', fontsize=30, color='#00ff41', weight='bold', fontname='monospace')
-        ax_head.text(0.5, 0.3, f"@{user_name}", ha='center', fontsize=18, color='white', fontname='monospace')
+        artists['title'] = ax_head.text(0.5, 0.7, "", ha='center', fontsize=30, color='#00ff41', weight='bold', fontname='monospace')
+        artists['user'] = ax_head.text(0.5, 0.3, "", ha='center', fontsize=18, color='white', fontname='monospace')
 
         # --- ROW 1: STATS GRID ---
         gs_stats = gs[1].subgridspec(1, 4)
-
-        def print_stat(idx, val, label, color='white', sublabel=None):
+        artists['stats'] = []
+        for idx, (label, color) in enumerate([("COMMITS", 'white'), ("DAY STREAK", "#f1c40f"),
+                                              ("MAX PROJ/DAY", "#3498db"), ("MAX COMM/DAY", "#e74c3c")]):
             ax = fig.add_subplot(gs_stats[idx])
             ax.axis('off')
-            ax.text(0.5, 0.6, str(val), ha='center', fontsize=24, color=color, weight='bold')
+            value = ax.text(0.5, 0.6, "", ha='center', fontsize=24, color=color, weight='bold')
             ax.text(0.5, 0.3, label, ha='center', fontsize=9, color='#888')
-            if sublabel:
-                ax.text(0.5, 0.15, sublabel, ha='center', fontsize=7, color='#555', style='italic')
-
-        print_stat(0, stats['total_commits'], "COMMITS")
-        print_stat(1, streak, "DAY STREAK", "#f1c40f")
-        print_stat(2, max_p, "MAX PROJ/DAY", "#3498db", f"on {date_p}")
-        print_stat(3, max_c, "MAX COMM/DAY", "#e74c3c", f"on {date_c}")
+            sublabel = ax.text(0.5, 0.15, "", ha='center', fontsize=7, color='#555', style='italic')
+            artists['stats'].append((value, sublabel))
 
         # --- ROW 2: VELOCITY ---
         ax_vel = fig.add_subplot(gs[2])
-        weeks = list(range(1, 53))
-        counts = [stats['weekly_activity'].get(w, 0) for w in weeks]
-        ax_vel.plot(weeks, counts, color='#00ff41', linewidth=2, marker='o', markersize=3)
-        ax_vel.fill_between(weeks, counts, color='#00ff41', alpha=0.1)
+        weeks = np.arange(1, 53)
+        artists['weeks'] = weeks
+        artists['velocity'], = ax_vel.plot(weeks, np.zeros(52), color='#00ff41', linewidth=2, marker='o', markersize=3)
+        artists['velocity_fill'] = None
         ax_vel.set_title("WEEKLY VELOCITY", color='white', weight='bold', fontsize=12)
 
         ax_vel.set_facecolor('#0f0f0f')
@@ -132,56 +157,118 @@ class Visualizer:
         ax_vel.set_xticks([1, 13, 26, 39, 52])
         ax_vel.set_xticklabels(['W1', 'W13', 'W26', 'W39', 'W52'], color='#666')
         ax_vel.set_yticks([])
+        artists['ax_vel'] = ax_vel
 
         # --- ROW 3: PUNCH CARD ---
         ax_punch = fig.add_subplot(gs[3])
-        pc = stats.get('punch_card', {})
-        X, Y, S = [], [], []
-        max_val = max(pc.values()) if pc else 1
-        for (d, h), c in pc.items():
-            X.append(d)
-            Y.append(h)
-            S.append((c / max_val) * 300 + 20)
-
-        ax_punch.scatter(X, Y, s=S, color='#e91e63', alpha=0.7, edgecolors='none')
+        artists['punch'] = ax_punch.scatter([], [], s=[], color='#e91e63', alpha=0.7, edgecolors='none')
         ax_punch.set_title("ACTIVITY HEATMAP", color='white', weight='bold', fontsize=12)
 
         ax_punch.set_facecolor('#0f0f0f')
+        ax_punch.set_xlim(-0.5, 6.5)
+        ax_punch.set_ylim(23.8, -0.8)
         ax_punch.set_xticks(range(7))
         ax_punch.set_xticklabels(['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun'], color='#aaa')
         ax_punch.set_yticks([0, 6, 12, 18, 23])
         ax_punch.set_yticklabels(['00:00', '06:00', '12:00', '18:00', '23:00'], color='#aaa')
-        ax_punch.invert_yaxis()
         ax_punch.spines['top'].set_visible(False)
         ax_punch.spines['right'].set_visible(False)
         ax_punch.spines['bottom'].set_color('#333')
         ax_punch.spines['left'].set_color('#333')
 
         # --- ROW 4: PIE CHART ---
-        ax_pie = fig.add_subplot(gs[4])
-        langs = stats.get('languages', {})
-        if langs:
-            s_langs = sorted(langs.items(), key=lambda x: x[1], reverse=True)[:5]
-            others = sum(langs.values()) - sum(v for k, v in s_langs)
-            L = [k for k, v in s_langs]
-            V = [v for k, v in s_langs]
-            if others > 0:
-                L.append("Other")
-                V.append(others)
-
-            ax_pie.pie(V, labels=L, autopct='%1.0f%%', colors=self.colors_pie,
+        artists['ax_pie'] = fig.add_subplot(gs[4])
+
+        # Footer
+        fig.text(0.5, 0.02, "Generated with DevWrapped Python", ha='center', color='#444', fontsize=8)
+        return artists
+
+    def _data_extent(self, artists):
+        """Bounding box, in inches, of the artists whose size depends on the data."""
+        from matplotlib.transforms import Bbox
+        fig = artists['fig']
+        renderer = fig.canvas.get_renderer()
+        texts = [artists['title'], artists['user']] + [text for pair in artists['stats'] for text in pair]
+        boxes = [text.get_window_extent(renderer) for text in texts]
+        boxes.append(artists['ax_pie'].get_tightbbox(renderer))
+        return Bbox.union(boxes).transformed(fig.dpi_scale_trans.inverted())
+
+    def _update_figure(self, artists, data):
+        artists['title'].set_text(data['title'])
+        artists['user'].set_text(data['user'])
+        for (value, sublabel), (val, sub) in zip(artists['stats'], data['stats']):
+            value.set_text(str(val))
+            sublabel.set_text(sub or "")
+
+        # Velocity: the fill polygon cannot be reshaped, so it is redrawn
+        counts = data['weekly']
+        ax_vel = artists['ax_vel']
+        artists['velocity'].set_ydata(counts)
+        if artists['velocity_fill'] is not None:
+            artists['velocity_fill'].remove()
+        artists['velocity_fill'] = ax_vel.fill_between(artists['weeks'], counts, color='#00ff41', alpha=0.1)
+        low, high = min(counts.min(), 0), max(counts.max(), 1)
+        margin = (high - low) * 0.05
+        ax_vel.set_ylim(low - margin, high + margin)
+
+        days, hours, sizes = data['punch']
+        artists['punch'].set_offsets(np.column_stack([days, hours]))
+        artists['punch'].set_sizes(sizes)
+
+        ax_pie = artists['ax_pie']
+        ax_pie.clear()
+        labels, values = data['languages']
+        if labels:
+            ax_pie.pie(values, labels=labels, autopct='%1.0f%%', colors=self.colors_pie,
                        textprops={'color': 'white', 'fontsize': 10})
-            ax_pie.add_artist(plt.Circle((0, 0), 0.7, fc='#0f0f0f'))
+            from matplotlib.patches import Circle
+            ax_pie.add_artist(Circle((0, 0), 0.7, fc='#0f0f0f'))
         else:
             ax_pie.text(0.5, 0.5, "NO DATA", ha='center', color='#555')
             ax_pie.axis('off')
-
         ax_pie.set_title("TOP LANGUAGES", color='white', weight='bold', fontsize=12)
 
-        # Footer
-        fig.text(0.5, 0.02, "Generated with DevWrapped Python", ha='center', color='#444', fontsize=8)
+    def generate_shareable_image(self, stats, user_name, year, output_file=None):
+        output_file = output_file or f"wrapped_{year}.png"
+        self.timings = {}
+        started = time.perf_counter()
+
+        def lap(stage):
+            nonlocal started
+            now = time.perf_counter()
+            self.timings[stage] = now - started
+            profiler.record(f"render.{stage}", started, now - started, 'render')
+            started = now
+
+        # 1. Prepare Data
+        data = self._image_data(stats, user_name, year)
+        lap('prepare')
+
+        # 2. Setup Figure
+        if self.renderer == 'classic' or self._template is None:
+            artists = self._build_figure()
+            if self.renderer == 'template':
+                self._template = artists
+        else:
+            artists = self._template
+        lap('build')
+
+        self._update_figure(artists, data)
+        lap('update')
+
+        # 3. Save. The template reuses the tight bounding box of an earlier
+        # render, which saves the extra layout pass of bbox_inches='tight',
+        # and recomputes it when the data-dependent artists reach beyond it.
+        fig = artists['fig']
+        bbox = 'tight'
+        if self.renderer == 'template':
+            extent = self._data_extent(artists)
+            cached = self._template_bbox
+            if cached is None or not (cached.x0 <= extent.x0 and cached.y0 <= extent.y0 and
+                                      extent.x1 <= cached.x1 and extent.y1 <= cached.y1):
+                self._template_bbox = fig.get_tightbbox(fig.canvas.get_renderer()).padded(0.1)
+            bbox = self._template_bbox
+        fig.savefig(output_file, facecolor=fig.get_facecolor(), dpi=self.DPI, bbox_inches=bbox)
+        lap('save')
 
-        output_file = f"wrapped_{year}.png"
-        plt.savefig(output_file, facecolor=fig.get_facecolor(), dpi=150, bbox_inches='tight')
-        plt.close(fig)
-        return output_file
\ No newline at end of file
+        return output_file